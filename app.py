@@ -3,71 +3,45 @@ Main SEO Analysis Application
 Coordinates all SEO analysis modules and handles web requests.
 """
 
-from flask import Flask, render_template, request, send_from_directory, jsonify, flash, redirect, url_for
-from bs4 import BeautifulSoup
+from flask import Flask, render_template, request, send_from_directory, jsonify, flash, redirect, url_for, Response, stream_with_context, get_template_attribute
 import requests
 from datetime import datetime
 import os
 from urllib.parse import urlparse
 import logging
-from flask_sqlalchemy import SQLAlchemy
-from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask_login import login_required
 import re
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-import string
-from dotenv import load_dotenv
-import urllib3
 import json
 import time
-import random
-import traceback
-from urllib.parse import urljoin
-import concurrent.futures
-from concurrent.futures import ThreadPoolExecutor
-import threading
-from queue import Queue
-import sys
-from io import StringIO
-import contextlib
-import tempfile
-import shutil
-from pathlib import Path
-import platform
-import socket
-import ssl
-from urllib.error import URLError
 import validators
 import sqlite3
+import tempfile
 
 # Import models and database
 from models import db
 from models.user import User
 from models.analysis import Analysis
 
-# Import analysis modules
-from modules import (
-    technical_seo,
-    on_page_seo,
-    content_seo,
-    user_experience,
-    security,
-    schema_markup,
-    advanced_content,
-    rank_analysis,
-    meta_keywords
+# Import utilities. The analyzers, the page fetcher and the PDF generator pull
+# in bs4, NLTK and reportlab, so they are imported on first use instead of
+# when a worker starts.
+from utils import http_client
+from utils.analysis_runner import run_analyzers
+from utils.domain_facts import init_domain_facts_table
+from utils.sitemap_writer import write_sitemaps
+from utils.scan_jobs import (
+    init_jobs_table,
+    submit_job,
+    scan_key,
+    get_job,
+    emit,
+    check_cancelled,
+    get_job_events,
+    request_cancel,
+    resume_job,
+    PENDING_STATUSES
 )
 
-# Import utilities
-from utils.pdf_generator import create_report
-from modules.enhanced_analysis.competitor import compare_websites
-from modules.enhanced_analysis.keywords import get_keyword_suggestions
-from modules.enhanced_analysis.ai_recommendations import get_ai_recommendations
-from modules.enhanced_analysis.mobile_testing import analyze_mobile_friendliness
-from modules.enhanced_analysis.speed_insights import analyze_speed
-
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-key-please-change')
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///seo_analysis.db')
@@ -105,6 +79,12 @@ def init_db():
     ''')
     conn.commit()
     conn.close()
+    
+    # Create scan jobs table
+    init_jobs_table()
+    
+    # Create domain facts cache table
+    init_domain_facts_table()
 
 def log_scan(url, scan_type, result_summary):
     conn = sqlite3.connect('usage_tracking.db')
@@ -143,8 +123,56 @@ def get_usage_stats():
 # Initialize database when app starts
 init_db()
 
-def perform_seo_analysis(url, categories):
-    """Coordinate the SEO analysis across all selected categories."""
+# Per-analysis deadlines in seconds for the enhanced analyses. They run
+# concurrently, so the slowest deadline has to stay well inside the gunicorn
+# worker timeout (--timeout 90 in the Procfile) once the page fetch is added.
+ENHANCED_DEADLINES = {
+    'competitor_analysis': 45,
+    'keyword_suggestions': 20,
+    'ai_recommendations': 20,
+    'mobile_analysis': 20,
+    'speed_insights': 45
+}
+
+# Keys and fallback messages used in the report when an enhanced analysis fails
+ENHANCED_ERRORS = {
+    'competitor_analysis': ('competitor_error', 'Failed to analyze competitors'),
+    'keyword_suggestions': ('keyword_error', 'Failed to analyze keywords'),
+    'ai_recommendations': ('ai_error', 'Failed to generate AI recommendations'),
+    'mobile_analysis': ('mobile_error', 'Failed to analyze mobile friendliness'),
+    'speed_insights': ('speed_error', 'Failed to analyze site speed')
+}
+
+# Seconds between checks for new progress events while streaming a scan
+SCAN_EVENTS_POLL_INTERVAL = 0.5
+
+def enhanced_result_entry(name, result):
+    """Return the (key, value) an enhanced analysis result is stored under in the report."""
+    if isinstance(result, dict) and result.get('status') in ('error', 'timeout'):
+        error_key, default_message = ENHANCED_ERRORS[name]
+        return error_key, result.get('message', default_message)
+    return name, result
+
+def perform_seo_analysis(url, categories, page=None, on_result=None):
+    """Coordinate the SEO analysis across all selected categories.
+
+    When the caller has already fetched the page it can pass the PageContext
+    in so the analyzers reuse it instead of downloading the page again.
+    on_result(category, result) is called as each category finishes.
+    """
+    from modules import (
+        technical_seo,
+        on_page_seo,
+        content_seo,
+        user_experience,
+        security,
+        schema_markup,
+        advanced_content,
+        rank_analysis,
+        meta_keywords
+    )
+    from utils.page_context import fetch_page
+
     seo_data = {'URL': url, 'Analysis Date': datetime.now().strftime("%Y-%m-%d")}
     
     # URL validation check
@@ -158,51 +186,41 @@ def perform_seo_analysis(url, categories):
         seo_data['URL'] = url
 
     try:
-        # Check if website is accessible
-        response = requests.head(url, timeout=5, allow_redirects=True)
-        if response.status_code >= 400:
-            seo_data['Error'] = f"Website is not accessible. Status code: {response.status_code}"
+        # Fetch the page once; every analyzer shares this response and soup
+        if page is None:
+            page = fetch_page(url)
+        if page.status_code >= 400:
+            seo_data['Error'] = f"Website is not accessible. Status code: {page.status_code}"
             return seo_data
             
-        # Make initial request to get the page content
-        response = requests.get(url, timeout=20, allow_redirects=True)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        response = page.response
+        soup = page.soup
+        
+        # Selected analyses are independent of each other, so they run
+        # concurrently and are merged into seo_data in this fixed order
+        analyses = [
+            ('Technical SEO', technical_seo.analyze, (response, soup)),
+            ('On-Page SEO', on_page_seo.analyze, (response, soup)),
+            ('Content SEO', content_seo.analyze, (response, soup)),
+            ('User Experience', user_experience.analyze, (response, soup, url)),
+            ('Security', security.analyze, (response, soup, url)),
+            ('Schema Markup', schema_markup.analyze, (response, soup)),
+            ('Advanced Content', advanced_content.analyze, (response, soup)),
+            ('Meta Keywords', meta_keywords.analyze, (response, soup))
+        ]
+        tasks = [task for task in analyses if task[0] in categories]
         
-        # Run selected analyses
-        if "Technical SEO" in categories:
-            seo_data['Technical SEO'] = technical_seo.analyze(response, soup)
-            
-        if "On-Page SEO" in categories:
-            seo_data['On-Page SEO'] = on_page_seo.analyze(response, soup)
-            
-        if "Content SEO" in categories:
-            seo_data['Content SEO'] = content_seo.analyze(response, soup)
-            
-        if "User Experience" in categories:
-            seo_data['User Experience'] = user_experience.analyze(response, soup, url)
-            
-        if "Security" in categories:
-            seo_data['Security'] = security.analyze(response, url)
-            
-        if "Schema Markup" in categories:
-            seo_data['Schema Markup'] = schema_markup.analyze(response, soup)
-            
-        if "Advanced Content" in categories:
-            seo_data['Advanced Content'] = advanced_content.analyze(response, soup)
-            
-        if "Meta Keywords" in categories:
-            seo_data['Meta Keywords'] = meta_keywords.analyze(response, soup)
-
         # Always include ranking analysis
-        seo_data['Ranking Analysis'] = rank_analysis.analyze(url)
+        tasks.append(('Ranking Analysis', rank_analysis.analyze, (url,)))
+        
+        seo_data.update(run_analyzers(tasks, on_result=on_result))
 
     except requests.exceptions.SSLError:
         # Try HTTP if HTTPS fails
         try:
             http_url = url.replace('https://', 'http://')
-            response = requests.get(http_url, timeout=20, allow_redirects=True)
+            page = fetch_page(http_url)
             seo_data['Security Warning'] = "Website is using unsecure HTTP protocol"
-            soup = BeautifulSoup(response.text, 'html.parser')
             # Run the analyses again...
         except:
             seo_data['Error'] = "Could not connect to website via HTTP or HTTPS"
@@ -218,6 +236,109 @@ def perform_seo_analysis(url, categories):
 
     return seo_data
 
+def run_scan(url, selected_categories, enhanced_options=None):
+    """Run a full scan and generate its PDF report.
+
+    This runs on the scan job pool rather than in a request thread.
+    enhanced_options is None for a basic scan, or a dict with
+    'competitor_urls' and 'keywords' to include the enhanced analyses.
+    Returns everything report.html needs to render the result.
+    """
+    from utils.page_context import fetch_page
+    from utils.pdf_generator import create_report
+
+    # Check if website is accessible; this fetch is shared by every analyzer
+    try:
+        page = fetch_page(url)
+    except requests.RequestException as e:
+        raise ValueError(f'Cannot connect to website: {str(e)}')
+    if page.status_code >= 400:
+        raise ValueError(f'Website is not accessible. Status code: {page.status_code}')
+    
+    emit('started', {
+        'categories': selected_categories,
+        'enhanced': enhanced_options is not None
+    })
+    
+    # Perform basic SEO analysis, streaming each category as it finishes
+    seo_data = perform_seo_analysis(
+        url, selected_categories, page=page,
+        on_result=lambda name, result: emit('category', {'name': name, 'result': result})
+    )
+    
+    # Stop here if the client watching the scan has gone away
+    check_cancelled()
+    
+    # Check if enhanced analysis is enabled
+    if enhanced_options is not None:
+        competitor_urls = enhanced_options['competitor_urls']
+        keywords = enhanced_options['keywords']
+        
+        from modules.enhanced_analysis.competitor import compare_websites
+        from modules.enhanced_analysis.keywords import get_keyword_suggestions
+        from modules.enhanced_analysis.ai_recommendations import get_ai_recommendations
+        from modules.enhanced_analysis.mobile_testing import analyze_mobile_friendliness
+        from modules.enhanced_analysis.speed_insights import analyze_speed
+
+        try:
+            # Run enhanced analyses concurrently, each within its own deadline
+            tasks = []
+            if competitor_urls:
+                tasks.append(('competitor_analysis', compare_websites, (url, competitor_urls, page)))
+            if keywords:
+                tasks.append(('keyword_suggestions', get_keyword_suggestions, (url, keywords, page)))
+            tasks += [
+                ('ai_recommendations', get_ai_recommendations, (url, page)),
+                ('mobile_analysis', analyze_mobile_friendliness, (url, page)),
+                ('speed_insights', analyze_speed, (url, page))
+            ]
+            
+            results = run_analyzers(
+                tasks, deadlines=ENHANCED_DEADLINES,
+                on_result=lambda name, result: emit('enhanced', {'name': name, 'result': result})
+            )
+            enhanced_results = dict(enhanced_result_entry(name, result) for name, result in results.items())
+            
+            # Add enhanced results to seo_data
+            seo_data['enhanced_results'] = enhanced_results
+            
+        except Exception as e:
+            seo_data['enhanced_error'] = str(e)
+        
+        check_cancelled()
+    
+    # Generate PDF report
+    pdf_filename = None
+    pdf_error = None
+    try:
+        logger.info("Attempting to generate PDF report")
+        pdf_filename = create_report(seo_data, selected_categories)
+        if pdf_filename:
+            logger.info(f"PDF report generated successfully: {pdf_filename}")
+            # Verify the file exists
+            reports_dir = os.path.join(app.root_path, 'reports')
+            if not os.path.exists(os.path.join(reports_dir, pdf_filename)):
+                raise FileNotFoundError(f"Generated PDF file not found: {pdf_filename}")
+        else:
+            raise ValueError("PDF generation returned None")
+    except Exception as e:
+        error_msg = f"Failed to generate PDF report: {str(e)}"
+        logger.error(error_msg)
+        pdf_error = error_msg
+    
+    emit('pdf', {'pdf_filename': pdf_filename, 'pdf_error': pdf_error})
+    
+    # Log the scan
+    result_summary = "Scan completed successfully"  # Replace with actual summary
+    log_scan(url, 'full', result_summary)
+    
+    return {
+        'seo_data': seo_data,
+        'pdf_filename': pdf_filename,
+        'pdf_error': pdf_error,
+        'categories': selected_categories
+    }
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
@@ -228,104 +349,133 @@ def index():
         if not validators.url(url):
             flash('Invalid URL format. Please enter a valid URL (e.g., https://example.com)', 'error')
             return redirect(url_for('index'))
-            
-        # Check if website is accessible
-        try:
-            response = requests.head(url, timeout=5, allow_redirects=True)
-            if response.status_code >= 400:
-                flash(f'Website is not accessible. Status code: {response.status_code}', 'error')
-                return redirect(url_for('index'))
-        except requests.RequestException as e:
-            flash(f'Cannot connect to website: {str(e)}', 'error')
-            return redirect(url_for('index'))
-            
-        # If we get here, the URL is valid and the site is accessible
-        flash('Website is valid and accessible. Starting analysis...', 'success')
-        
-        # Perform basic SEO analysis
-        seo_data = perform_seo_analysis(url, selected_categories)
         
         # Check if enhanced analysis is enabled
+        enhanced_options = None
         if request.form.get('enhanced_analysis'):
-            # Process competitor URLs
-            competitor_urls = [url.strip() for url in request.form.get('competitor_urls', '').split('\n') if url.strip()]
-            
-            # Process keywords
-            keywords = [kw.strip() for kw in request.form.get('keywords', '').split(',') if kw.strip()]
-            
-            try:
-                # Run enhanced analyses
-                enhanced_results = {}
-                
-                if competitor_urls:
-                    comp_analysis = compare_websites(url, competitor_urls)
-                    if isinstance(comp_analysis, dict) and comp_analysis.get('status') == 'error':
-                        enhanced_results['competitor_error'] = comp_analysis.get('message', 'Failed to analyze competitors')
-                    else:
-                        enhanced_results['competitor_analysis'] = comp_analysis
-                
-                if keywords:
-                    kw_analysis = get_keyword_suggestions(url, keywords)
-                    if isinstance(kw_analysis, dict) and kw_analysis.get('status') == 'error':
-                        enhanced_results['keyword_error'] = kw_analysis.get('message', 'Failed to analyze keywords')
-                    else:
-                        enhanced_results['keyword_suggestions'] = kw_analysis
-                
-                ai_rec = get_ai_recommendations(url)
-                if isinstance(ai_rec, dict) and ai_rec.get('status') == 'error':
-                    enhanced_results['ai_error'] = ai_rec.get('message', 'Failed to generate AI recommendations')
-                else:
-                    enhanced_results['ai_recommendations'] = ai_rec
-                
-                mobile = analyze_mobile_friendliness(url)
-                if isinstance(mobile, dict) and mobile.get('status') == 'error':
-                    enhanced_results['mobile_error'] = mobile.get('message', 'Failed to analyze mobile friendliness')
-                else:
-                    enhanced_results['mobile_analysis'] = mobile
-                
-                speed = analyze_speed(url)
-                if isinstance(speed, dict) and speed.get('status') == 'error':
-                    enhanced_results['speed_error'] = speed.get('message', 'Failed to analyze site speed')
-                else:
-                    enhanced_results['speed_insights'] = speed
+            enhanced_options = {
+                # Process competitor URLs
+                'competitor_urls': [url.strip() for url in request.form.get('competitor_urls', '').split('\n') if url.strip()],
+                # Process keywords
+                'keywords': [kw.strip() for kw in request.form.get('keywords', '').split(',') if kw.strip()]
+            }
+        
+        # Run the scan in the background; the report page polls until it is done.
+        # An identical scan that is running or finished recently is reused.
+        key = scan_key('full', url, sorted(selected_categories), enhanced_options)
+        job_id = submit_job('full', url, run_scan, url, selected_categories, enhanced_options, key=key)
+        return redirect(url_for('scan_report', job_id=job_id))
+    
+    return render_template('index.html')
+
+@app.route('/scan/<job_id>')
+def scan_report(job_id):
+    """Show the report for a scan job, or its progress while it is still running."""
+    job = get_job(job_id)
+    if job is None or job['job_type'] != 'full':
+        flash('Scan not found. Please start a new analysis.', 'error')
+        return redirect(url_for('index'))
+    
+    if job['status'] != 'done':
+        # A reload closes the old event stream; keep the scan going for the new page
+        if job['status'] == 'cancelling':
+            resume_job(job_id)
+            job['status'] = 'running'
+        return render_template('report.html',
+                             job=job,
+                             seo_data={'URL': job['url']},
+                             categories=[])
+    
+    result = job['result']
+    return render_template('report.html',
+                         job=job,
+                         seo_data=result['seo_data'],
+                         pdf_filename=result['pdf_filename'],
+                         pdf_error=result['pdf_error'],
+                         categories=result['categories'])
+
+def render_scan_event(event, data):
+    """Turn a scan progress event into the payload sent to report.html."""
+    if event == 'category':
+        render_category = get_template_attribute('report_sections.html', 'render_category')
+        return {'name': data['name'], 'html': str(render_category(data['name'], data['result']))}
+    if event == 'enhanced':
+        render_enhanced_result = get_template_attribute('report_sections.html', 'render_enhanced_result')
+        key, value = enhanced_result_entry(data['name'], data['result'])
+        return {'name': data['name'], 'html': str(render_enhanced_result(data['name'], {key: value}))}
+    if event == 'pdf' and data['pdf_filename']:
+        data['download_url'] = url_for('download_file', filename=data['pdf_filename'])
+    return data
+
+def format_sse(event, data, event_id=None):
+    """Format one Server-Sent Event message."""
+    message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    if event_id is not None:
+        message = f"id: {event_id}\n" + message
+    return message
+
+@app.route('/scan/<job_id>/events')
+def scan_events(job_id):
+    """Stream a scan's results to the browser as Server-Sent Events.
+
+    Each category, enhanced analysis and the PDF link is sent as soon as it
+    is ready. If the browser disconnects before the scan finishes and does
+    not reconnect within the grace period, the scan drops its remaining work.
+    """
+    if get_job(job_id) is None:
+        return jsonify({'status': 'error', 'error': 'Scan not found'}), 404
+    
+    last_event_id = int(request.headers.get('Last-Event-ID', 0) or 0)
+    
+    @stream_with_context
+    def generate():
+        after_id = last_event_id
+        finished = False
+        # EventSource reconnects on its own; take back the cancel the dropped stream sent
+        resume_job(job_id)
+        try:
+            while True:
+                for event_id, event, data in get_job_events(job_id, after_id):
+                    after_id = event_id
+                    yield format_sse(event, render_scan_event(event, data), event_id)
                 
-                # Add enhanced results to seo_data
-                seo_data['enhanced_results'] = enhanced_results
+                job = get_job(job_id)
+                if job['status'] not in PENDING_STATUSES:
+                    finished = True
+                    yield format_sse('end', {'status': job['status'], 'error': job['error']})
+                    return
                 
-            except Exception as e:
-                seo_data['enhanced_error'] = str(e)
-        
-        # Generate PDF report
-        pdf_filename = None
-        pdf_error = None
-        try:
-            logger.info("Attempting to generate PDF report")
-            pdf_filename = create_report(seo_data, selected_categories)
-            if pdf_filename:
-                logger.info(f"PDF report generated successfully: {pdf_filename}")
-                # Verify the file exists
-                reports_dir = os.path.join(app.root_path, 'reports')
-                if not os.path.exists(os.path.join(reports_dir, pdf_filename)):
-                    raise FileNotFoundError(f"Generated PDF file not found: {pdf_filename}")
-            else:
-                raise ValueError("PDF generation returned None")
-        except Exception as e:
-            error_msg = f"Failed to generate PDF report: {str(e)}"
-            logger.error(error_msg)
-            pdf_error = error_msg
-            flash("Failed to generate PDF report. You can still view the analysis results online.", "warning")
-        
-        # Log the scan
-        result_summary = "Scan completed successfully"  # Replace with actual summary
-        log_scan(url, 'full', result_summary)
-        
-        return render_template('report.html', 
-                             seo_data=seo_data, 
-                             pdf_filename=pdf_filename,
-                             pdf_error=pdf_error,
-                             categories=selected_categories)
+                # Comment line; lets the server notice a closed connection
+                yield ": keep-alive\n\n"
+                time.sleep(SCAN_EVENTS_POLL_INTERVAL)
+        finally:
+            if not finished:
+                request_cancel(job_id)
     
-    return render_template('index.html')
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/scans/<job_id>')
+def scan_status(job_id):
+    """Report the status of a scan job, including its result once done."""
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'error': 'Scan not found'}), 404
+    
+    response = {
+        'job_id': job['id'],
+        'url': job['url'],
+        'status': job['status']
+    }
+    if job['status'] == 'done':
+        response['result'] = job['result']
+        if job['job_type'] == 'full':
+            response['report_url'] = url_for('scan_report', job_id=job['id'])
+    elif job['status'] == 'failed':
+        response['error'] = job['error']
+    return jsonify(response)
 
 @app.route('/download/<path:filename>')
 def download_file(filename):
@@ -350,9 +500,47 @@ def download_file(filename):
         app.logger.error(f"Error downloading file {filename}: {str(e)}")
         return "Error downloading file", 500
 
+def run_enhanced_scan(url, competitor_urls, main_keywords):
+    """Run all enhanced analyses for a URL on the scan job pool."""
+    from modules.enhanced_analysis.competitor import compare_websites
+    from modules.enhanced_analysis.keywords import get_keyword_suggestions
+    from modules.enhanced_analysis.ai_recommendations import get_ai_recommendations
+    from modules.enhanced_analysis.mobile_testing import analyze_mobile_friendliness
+    from modules.enhanced_analysis.speed_insights import analyze_speed
+    from utils.page_context import fetch_page
+
+    # Fetch the page once and share it with every analysis
+    page = fetch_page(url)
+    
+    # Run all enhanced analyses in parallel; any analysis that misses its
+    # deadline is reported as timed out instead of failing the scan
+    results = run_analyzers([
+        ('competitor_analysis', compare_websites, (url, competitor_urls, page)),
+        ('keyword_suggestions', get_keyword_suggestions, (url, main_keywords, page)),
+        ('ai_recommendations', get_ai_recommendations, (url, page)),
+        ('mobile_analysis', analyze_mobile_friendliness, (url, page)),
+        ('speed_insights', analyze_speed, (url, page))
+    ], deadlines=ENHANCED_DEADLINES)
+    timed_out = [name for name, result in results.items()
+                 if isinstance(result, dict) and result.get('status') == 'timeout']
+    
+    # Log the scan
+    result_summary = "Scan completed successfully"  # Replace with actual summary
+    log_scan(url, 'enhanced', result_summary)
+    
+    return {
+        'status': 'partial' if timed_out else 'success',
+        'results': results,
+        'timed_out': timed_out
+    }
+
 @app.route('/api/enhanced-analysis', methods=['POST'])
 def enhanced_analysis():
-    """Endpoint for enhanced SEO analysis."""
+    """Endpoint for enhanced SEO analysis.
+
+    The analysis runs as a background job; poll the returned status_url for
+    the result.
+    """
     data = request.get_json()
     url = data.get('url')
     competitor_urls = data.get('competitor_urls', [])
@@ -362,23 +550,13 @@ def enhanced_analysis():
         return jsonify({'error': 'URL is required'}), 400
     
     try:
-        # Run all enhanced analyses in parallel
-        results = {
-            'competitor_analysis': compare_websites(url, competitor_urls),
-            'keyword_suggestions': get_keyword_suggestions(url, main_keywords),
-            'ai_recommendations': get_ai_recommendations(url),
-            'mobile_analysis': analyze_mobile_friendliness(url),
-            'speed_insights': analyze_speed(url)
-        }
-        
-        # Log the scan
-        result_summary = "Scan completed successfully"  # Replace with actual summary
-        log_scan(url, 'enhanced', result_summary)
-        
+        key = scan_key('enhanced', url, competitor_urls, main_keywords)
+        job_id = submit_job('enhanced', url, run_enhanced_scan, url, competitor_urls, main_keywords, key=key)
         return jsonify({
-            'status': 'success',
-            'results': results
-        })
+            'status': 'queued',
+            'job_id': job_id,
+            'status_url': url_for('scan_status', job_id=job_id)
+        }), 202
         
     except Exception as e:
         return jsonify({
@@ -409,7 +587,7 @@ def create_robots_txt():
         
         # First check if we have write access
         try:
-            response = requests.put(robots_url, data=content)
+            response = http_client.get_session().put(robots_url, data=content)
             if response.status_code in [200, 201, 204]:
                 return jsonify({
                     'status': 'success',
@@ -436,18 +614,45 @@ def create_robots_txt():
             'error': str(e)
         }), 500
 
+def put_sitemaps(base_url, urls, compress=False):
+    """Generate sitemaps for urls and PUT them under base_url.
+
+    The files are streamed to a temporary directory and uploaded from there,
+    split and indexed as the protocol requires. Returns the response of the
+    first failed upload, or of the last one (sitemap.xml) if all succeeded.
+    """
+    lastmod = datetime.now().strftime("%Y-%m-%d")
+    entries = ({'loc': url, 'lastmod': lastmod} for url in urls)
+    content_type = 'application/gzip' if compress else 'application/xml'
+    
+    with tempfile.TemporaryDirectory() as directory:
+        # Always at least sitemap.xml, so there is a response to return
+        for filename in write_sitemaps(entries, directory, base_url, compress=compress, lastmod=lastmod):
+            with open(os.path.join(directory, filename), 'rb') as f:
+                response = http_client.get_session().put(
+                    f"{base_url}/{filename}", data=f, headers={'Content-Type': content_type}
+                )
+            if response.status_code not in [200, 201, 204]:
+                break
+    return response
+
 @app.route('/create_sitemap', methods=['POST'])
 def create_sitemap():
-    """Create a sitemap.xml file for the specified domain."""
+    """Create a sitemap.xml file for the specified domain.
+
+    Takes either the sitemap content to upload as-is, or a list of urls to
+    generate it from; "gzip": true uploads generated files gzipped.
+    """
     try:
         data = request.get_json()
         url = data.get('url')
         content = data.get('content')
+        urls = data.get('urls')
         
-        if not url or not content:
+        if not url or not (content or urls):
             return jsonify({
                 'status': 'error',
-                'message': 'URL and content are required'
+                'message': 'URL and content or urls are required'
             }), 400
             
         # Parse the URL to get the domain
@@ -459,7 +664,10 @@ def create_sitemap():
         
         # First check if we have write access
         try:
-            response = requests.put(sitemap_url, data=content)
+            if content:
+                response = http_client.get_session().put(sitemap_url, data=content)
+            else:
+                response = put_sitemaps(f"{parsed_url.scheme}://{domain}", urls, compress=bool(data.get('gzip')))
             if response.status_code in [200, 201, 204]:
                 return jsonify({
                     'status': 'success',
@@ -496,50 +704,16 @@ def analyze():
         if not validators.url(url):
             flash('Invalid URL format. Please enter a valid URL (e.g., https://example.com)', 'error')
             return redirect(url_for('dashboard'))
-            
-        # Check if website is accessible
-        try:
-            response = requests.head(url, timeout=5, allow_redirects=True)
-            if response.status_code >= 400:
-                flash(f'Website is not accessible. Status code: {response.status_code}', 'error')
-                return redirect(url_for('dashboard'))
-        except requests.RequestException as e:
-            flash(f'Cannot connect to website: {str(e)}', 'error')
-            return redirect(url_for('dashboard'))
-            
-        # If we get here, the URL is valid and the site is accessible
-        flash('Website is valid and accessible. Starting analysis...', 'success')
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
         
         # Get selected categories
         selected_categories = request.form.getlist('categories')
         if not selected_categories:
             selected_categories = ['Technical SEO', 'On-Page SEO', 'Content SEO']
         
-        # Perform SEO analysis
-        seo_data = perform_seo_analysis(url, selected_categories)
-        
-        # Generate PDF report
-        pdf_filename = None
-        pdf_error = None
-        try:
-            pdf_filename = generate_pdf_report(seo_data, url)
-        except Exception as e:
-            pdf_error = str(e)
-            flash("Failed to generate PDF report. You can still view the analysis results online.", "warning")
-        
-        # Log the scan
-        result_summary = "Scan completed successfully"  # Replace with actual summary
-        log_scan(url, 'full', result_summary)
-        
-        return render_template('report.html', 
-                             seo_data=seo_data, 
-                             pdf_filename=pdf_filename,
-                             pdf_error=pdf_error,
-                             categories=selected_categories)
+        # Run the scan in the background; the report page polls until it is done
+        key = scan_key('full', url, sorted(selected_categories), None)
+        job_id = submit_job('full', url, run_scan, url, selected_categories, key=key)
+        return redirect(url_for('scan_report', job_id=job_id))
                              
     except Exception as e:
         flash(f"An error occurred during analysis: {str(e)}", "error")
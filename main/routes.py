@@ -7,7 +7,6 @@ from flask import render_template, request, send_from_directory, redirect, url_f
 from flask_login import login_required, current_user
 from datetime import datetime
 import requests
-from bs4 import BeautifulSoup
 
 from . import main
 from .. import db
@@ -22,6 +21,8 @@ from ..modules import (
     advanced_content
 )
 from ..utils.pdf_generator import create_report
+from ..utils.page_context import fetch_page
+from ..utils.analysis_runner import run_analyzers
 
 def perform_seo_analysis(url, categories):
     """Coordinate the SEO analysis across all selected categories."""
@@ -33,39 +34,30 @@ def perform_seo_analysis(url, categories):
         seo_data['URL'] = url
 
     try:
-        # Make initial request to get the page content
-        response = requests.get(url, timeout=20, allow_redirects=True)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Fetch the page once; every analyzer shares this response and soup
+        page = fetch_page(url)
+        response = page.response
+        soup = page.soup
         
-        # Run selected analyses
-        if "Technical SEO" in categories:
-            seo_data['Technical SEO'] = technical_seo.analyze(response, soup)
-            
-        if "On-Page SEO" in categories:
-            seo_data['On-Page SEO'] = on_page_seo.analyze(response, soup)
-            
-        if "Content SEO" in categories:
-            seo_data['Content SEO'] = content_seo.analyze(response, soup)
-            
-        if "User Experience" in categories:
-            seo_data['User Experience'] = user_experience.analyze(response, soup, url)
-            
-        if "Security" in categories:
-            seo_data['Security'] = security.analyze(response, url)
-            
-        if "Schema Markup" in categories:
-            seo_data['Schema Markup'] = schema_markup.analyze(response, soup)
-            
-        if "Advanced Content" in categories:
-            seo_data['Advanced Content'] = advanced_content.analyze(response, soup)
+        # Selected analyses are independent of each other, so they run
+        # concurrently and are merged into seo_data in this fixed order
+        analyses = [
+            ('Technical SEO', technical_seo.analyze, (response, soup)),
+            ('On-Page SEO', on_page_seo.analyze, (response, soup)),
+            ('Content SEO', content_seo.analyze, (response, soup)),
+            ('User Experience', user_experience.analyze, (response, soup, url)),
+            ('Security', security.analyze, (response, soup, url)),
+            ('Schema Markup', schema_markup.analyze, (response, soup)),
+            ('Advanced Content', advanced_content.analyze, (response, soup))
+        ]
+        seo_data.update(run_analyzers([task for task in analyses if task[0] in categories]))
 
     except requests.exceptions.SSLError:
         # Try HTTP if HTTPS fails
         try:
             http_url = url.replace('https://', 'http://')
-            response = requests.get(http_url, timeout=20, allow_redirects=True)
+            page = fetch_page(http_url)
             seo_data['Security Warning'] = "Website is using unsecure HTTP protocol"
-            soup = BeautifulSoup(response.text, 'html.parser')
             # Run the analyses again...
         except:
             seo_data['Error'] = "Could not connect to website via HTTP or HTTPS"
@@ -3,55 +3,43 @@ Advanced Content Analysis Module
 Handles in-depth content analysis including keyword density and broken links.
 """
 
-import requests
+from utils.charset import response_text
+from utils.document_index import get_index
+from utils.document_text import get_document_text
+from utils.link_checker import check_links, is_broken, unique_links
 
 def analyze(response, soup):
     """Analyze advanced content elements."""
-    all_text = soup.get_text()
-    words = all_text.lower().split()
-    word_count = len(words)
+    index = get_index(soup)
+    text = get_document_text(soup)
+    all_text = text.visible_text
+    stats = text.stats
     
     # Keyword density analysis
     common_words = set(['the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 
                        'i', 'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you', 'do', 'at'])
-    word_freq = {}
-    for word in words:
-        if word not in common_words and len(word) > 3:
-            word_freq[word] = word_freq.get(word, 0) + 1
+    top_keywords = stats.most_common(5, keep=lambda word: word not in common_words and len(word) > 3)
     
     # Heading hierarchy analysis
-    headings = {
-        'h1': len(soup.find_all('h1')),
-        'h2': len(soup.find_all('h2')),
-        'h3': len(soup.find_all('h3')),
-        'h4': len(soup.find_all('h4')),
-        'h5': len(soup.find_all('h5')),
-        'h6': len(soup.find_all('h6'))
-    }
+    headings = {name: len(tags) for name, tags in index.headings.items()}
     
-    # Broken link analysis
-    links = soup.find_all('a')
-    broken_links = []
-    for link in links[:10]:  # Check first 10 links
-        href = link.get('href')
-        if href and href.startswith(('http://', 'https://')):
-            try:
-                head_response = requests.head(href, timeout=5)
-                if head_response.status_code >= 400:
-                    broken_links.append(href)
-            except:
-                broken_links.append(href)
+    # Broken link analysis: every unique absolute link, checked concurrently
+    hrefs = [link.get('href') for link in index.links]
+    links = unique_links(href for href in hrefs if href and href.startswith(('http://', 'https://')))
+    statuses = check_links(links)
+    broken_links = [url for url, status in statuses.items() if is_broken(status)]
     
     # Content-to-HTML ratio
-    html_size = len(response.text)
+    html_size = len(response_text(response))
     text_size = len(all_text)
     content_ratio = (text_size / html_size) * 100 if html_size > 0 else 0
     
     return {
-        'Word Count': word_count,
-        'Top Keywords': sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:5],
+        'Word Count': stats.word_count,
+        'Top Keywords': top_keywords,
         'Heading Structure': headings,
         'Content-to-HTML Ratio': f"{content_ratio:.2f}%",
+        'Links Checked': f"{len(statuses)} of {len(links)}",
         'Broken Links Found': len(broken_links),
         'Broken Links': broken_links[:5] if broken_links else "None found"
     } 
\ No newline at end of file
@@ -3,13 +3,19 @@ Content SEO Analysis Module
 Handles analysis of content elements like paragraphs, images, and alt text.
 """
 
+from utils.analysis_cache import memoize_on_body
+from utils.charset import response_text
+from utils.document_index import get_index
+
+@memoize_on_body('content_seo', version=2)
 def analyze(response, soup):
     """Analyze content SEO elements."""
-    paragraphs = soup.find_all('p')
-    images = soup.find_all('img')
+    index = get_index(soup)
+    paragraphs = index.find_all('p')
+    images = index.images
     
     return {
-        'Word Count': len(response.text.split()),
+        'Word Count': len(response_text(response).split()),
         'Paragraph Count': len(paragraphs),
         'Image Count': len(images),
         'Images with Alt Text': len([img for img in images if img.get('alt')])
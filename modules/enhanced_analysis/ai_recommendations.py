@@ -3,19 +3,19 @@ AI Recommendations Module
 Provides AI-powered content and SEO recommendations.
 """
 
-from bs4 import BeautifulSoup
-import requests
-import re
-from collections import defaultdict
+from utils.analysis_cache import body_digest, cached_result
+from utils.document_index import get_index
+from utils.document_text import get_document_text
+from utils.html_parser import resolve_backend
+from utils.page_context import fetch_page
 
 def analyze_content_structure(soup):
     """Analyze content structure and provide recommendations."""
     recommendations = []
+    index = get_index(soup)
     
     # Check heading structure
-    headings = defaultdict(list)
-    for i in range(1, 7):
-        headings[f'h{i}'] = soup.find_all(f'h{i}')
+    headings = index.headings
     
     if not headings['h1']:
         recommendations.append({
@@ -33,8 +33,7 @@ def analyze_content_structure(soup):
         })
     
     # Check content length
-    paragraphs = soup.find_all('p')
-    total_text = ' '.join(p.get_text() for p in paragraphs)
+    total_text = ' '.join(get_document_text(soup).blocks('p'))
     word_count = len(total_text.split())
     
     if word_count < 300:
@@ -46,7 +45,7 @@ def analyze_content_structure(soup):
         })
     
     # Check image optimization
-    images = soup.find_all('img')
+    images = index.images
     for img in images:
         if not img.get('alt'):
             recommendations.append({
@@ -57,7 +56,7 @@ def analyze_content_structure(soup):
             })
     
     # Check internal linking
-    links = soup.find_all('a')
+    links = index.links
     internal_links = [link for link in links if not link.get('href', '').startswith(('http', 'https'))]
     if len(internal_links) < 2:
         recommendations.append({
@@ -69,10 +68,9 @@ def analyze_content_structure(soup):
     
     return recommendations
 
-def analyze_readability(text):
-    """Analyze text readability and provide recommendations."""
-    sentences = re.split(r'[.!?]+', text)
-    words_per_sentence = sum(len(s.split()) for s in sentences if s.strip()) / len(sentences) if sentences else 0
+def analyze_readability(stats):
+    """Analyze readability from a text's statistics and provide recommendations."""
+    words_per_sentence = stats.mean_sentence_length()
     
     recommendations = []
     
@@ -85,9 +83,8 @@ def analyze_readability(text):
         })
     
     # Check paragraph length
-    paragraphs = text.split('\n\n')
-    for i, p in enumerate(paragraphs):
-        if len(p.split()) > 100:
+    for i, length in enumerate(stats.paragraph_lengths):
+        if length > 100:
             recommendations.append({
                 'type': 'suggestion',
                 'aspect': 'readability',
@@ -97,21 +94,20 @@ def analyze_readability(text):
     
     return recommendations
 
-def get_ai_recommendations(url):
+def get_ai_recommendations(url, page=None):
     """Get AI-powered recommendations for a URL."""
     try:
-        response = requests.get(url, timeout=20)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        if page is None:
+            page = fetch_page(url)
         
-        # Get content recommendations
-        content_recommendations = analyze_content_structure(soup)
+        def recommend():
+            soup = page.soup
+            # Content and readability recommendations
+            return analyze_content_structure(soup) + analyze_readability(get_document_text(soup).stats)
         
-        # Get readability recommendations
-        text = soup.get_text()
-        readability_recommendations = analyze_readability(text)
-        
-        # Combine all recommendations
-        all_recommendations = content_recommendations + readability_recommendations
+        # Both only read the markup, so an unchanged page is not analyzed again
+        all_recommendations = cached_result('ai_recommendations', 3, body_digest(page.response), recommend,
+                                            args=(resolve_backend(page.parser),))
         
         # Prioritize recommendations
         prioritized_recommendations = {
@@ -3,19 +3,20 @@ Competitor Analysis Module
 Compares multiple websites and provides competitive insights.
 """
 
-import requests
-from bs4 import BeautifulSoup
 from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
+from utils.page_context import fetch_page
 from ..technical_seo import analyze as technical_analysis
 from ..content_seo import analyze as content_analysis
 from ..on_page_seo import analyze as onpage_analysis
 
-def analyze_competitor(url):
+def analyze_competitor(url, page=None):
     """Analyze a single competitor website."""
     try:
-        response = requests.get(url, timeout=20, allow_redirects=True)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        if page is None:
+            page = fetch_page(url)
+        response = page.response
+        soup = page.soup
         
         return {
             'url': url,
@@ -31,15 +32,17 @@ def analyze_competitor(url):
             'message': str(e)
         }
 
-def compare_websites(main_url, competitor_urls):
-    """Compare main website with competitor websites."""
+def compare_websites(main_url, competitor_urls, page=None):
+    """Compare main website with competitor websites.
+
+    If the main site has already been fetched for this scan, pass its
+    PageContext so it is not downloaded again.
+    """
     # Analyze all websites in parallel
-    urls = [main_url] + competitor_urls
     with ThreadPoolExecutor(max_workers=5) as executor:
-        results = list(executor.map(analyze_competitor, urls))
-    
-    main_site = results[0]
-    competitor_sites = results[1:]
+        main_future = executor.submit(analyze_competitor, main_url, page)
+        competitor_sites = list(executor.map(analyze_competitor, competitor_urls))
+        main_site = main_future.result()
     
     comparison = {
         'main_site': main_site,
@@ -3,81 +3,35 @@ Keyword Analysis Module
 Provides keyword suggestions and ranking analysis.
 """
 
-from collections import Counter
+import os
 import re
-from bs4 import BeautifulSoup
-import requests
 
-# Create the download function first
-def download_nltk_data():
-    """Download required NLTK data."""
-    try:
-        import nltk
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt', quiet=True)
-        
-        try:
-            nltk.data.find('corpora/stopwords')
-        except LookupError:
-            nltk.download('stopwords', quiet=True)
-    except Exception as e:
-        print(f"Error downloading NLTK data: {str(e)}")
+from utils.cooccurrence import CooccurrenceIndex
+from utils.document_text import get_document_text
+from utils.text_processing import english_stopwords
+from utils.page_context import fetch_page
 
-# Initialize NLTK with error handling
-try:
-    import nltk
-    from nltk.corpus import stopwords
-    from nltk.tokenize import word_tokenize
-    download_nltk_data()
-except ImportError:
-    print("NLTK not installed. Running pip install nltk...")
-    import subprocess
-    subprocess.check_call(['pip', 'install', 'nltk'])
-    import nltk
-    from nltk.corpus import stopwords
-    from nltk.tokenize import word_tokenize
-    download_nltk_data()
+# Words on either side of a main keyword that count as appearing with it
+SUGGESTION_WINDOW = int(os.environ.get('KEYWORD_SUGGESTION_WINDOW', 10))
 
-def extract_keywords(text):
-    """Extract keywords from text, removing common words."""
-    try:
-        # Tokenize and convert to lowercase
-        tokens = word_tokenize(text.lower())
-        
-        # Remove stopwords and non-alphabetic tokens
-        stop_words = set(stopwords.words('english'))
-        keywords = [word for word in tokens 
-                   if word.isalpha() and 
-                   word not in stop_words and 
-                   len(word) > 2]
-        
-        return Counter(keywords)
-    except Exception as e:
-        print(f"Error in keyword extraction: {str(e)}")
-        # Fallback to simple word splitting if NLTK fails
-        words = text.lower().split()
-        return Counter([w for w in words if len(w) > 2])
+def is_keyword_filter():
+    """Return a predicate that keeps alphabetic words of 3+ letters that are not stopwords."""
+    stop_words = english_stopwords()
+    return lambda word: word.isalpha() and len(word) > 2 and word not in stop_words
 
 def analyze_keyword_density(soup):
     """Analyze keyword density in the content."""
     try:
-        # Get all text content
-        text = soup.get_text()
-        
-        # Extract keywords and their frequencies
-        keyword_freq = extract_keywords(text)
-        total_words = len(text.split())  # Simplified word count for robustness
+        stats = get_document_text(soup).stats
         
-        # Calculate density
+        # Density of the most frequent keywords
         keyword_density = {
-            word: (count / total_words) * 100 
-            for word, count in keyword_freq.most_common(20)
+            word: stats.density(word)
+            for word, count in stats.most_common(20, keep=is_keyword_filter())
         }
         
         return {
-            'total_words': total_words,
+            'total_words': stats.word_count,
             'keyword_density': keyword_density,
             'top_keywords': list(keyword_density.keys())
         }
@@ -90,36 +44,26 @@ def analyze_keyword_density(soup):
         }
 
 def suggest_keywords(main_keywords, soup):
-    """Suggest related keywords based on content analysis."""
+    """Suggest the terms most strongly associated with the main keywords.
+
+    Terms are ranked by PMI with the main keywords, counting the words within
+    SUGGESTION_WINDOW of each keyword occurrence.
+    """
     try:
-        # Extract all keywords from content
-        content_keywords = extract_keywords(soup.get_text())
-        
-        # Find keywords that often appear near the main keywords
-        related_keywords = set()
-        paragraphs = soup.find_all('p')
-        
-        for p in paragraphs:
-            text = p.get_text().lower()
-            for keyword in main_keywords:
-                if keyword.lower() in text:
-                    # Get words around the keyword
-                    words = extract_keywords(text)
-                    related_keywords.update(words.keys())
-        
-        # Remove the main keywords from related keywords
-        related_keywords = related_keywords - set(main_keywords)
+        index = CooccurrenceIndex(get_document_text(soup).stats, window=SUGGESTION_WINDOW)
+        related_keywords = index.related(main_keywords, limit=10, is_candidate=is_keyword_filter())
         
-        return list(related_keywords)[:10]
+        return [term for term, score in related_keywords]
     except Exception as e:
         print(f"Error in keyword suggestion: {str(e)}")
         return []
 
-def get_keyword_suggestions(url, main_keywords):
+def get_keyword_suggestions(url, main_keywords, page=None):
     """Get keyword suggestions for a URL."""
     try:
-        response = requests.get(url, timeout=20)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        if page is None:
+            page = fetch_page(url)
+        soup = page.soup
         
         # Analyze current keyword usage
         density_analysis = analyze_keyword_density(soup)
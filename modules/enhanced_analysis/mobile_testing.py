@@ -3,14 +3,18 @@ Mobile Testing Module
 Analyzes mobile-friendliness and responsiveness of websites.
 """
 
-import requests
-from bs4 import BeautifulSoup
 import re
 from urllib.parse import urljoin
 
+from utils import http_client
+from utils.analysis_cache import body_digest, cached_result
+from utils.document_index import get_index
+from utils.html_parser import resolve_backend
+from utils.page_context import fetch_page
+
 def check_viewport(soup):
     """Check if viewport meta tag is properly set."""
-    viewport = soup.find('meta', attrs={'name': 'viewport'})
+    viewport = get_index(soup).meta('viewport')
     if not viewport:
         return {
             'status': 'error',
@@ -36,7 +40,7 @@ def check_font_sizes(soup):
     issues = []
     
     # Check font-size in style attributes
-    elements_with_style = soup.find_all(style=True)
+    elements_with_style = get_index(soup).with_attr('style')
     for element in elements_with_style:
         style = element.get('style', '')
         if 'font-size' in style:
@@ -58,7 +62,7 @@ def check_tap_targets(soup):
     issues = []
     
     # Check links and buttons
-    clickable_elements = soup.find_all(['a', 'button'])
+    clickable_elements = get_index(soup).find_all('a', 'button')
     for element in clickable_elements:
         style = element.get('style', '')
         
@@ -83,7 +87,7 @@ def check_responsive_images(soup, base_url):
     """Check for responsive images."""
     issues = []
     
-    images = soup.find_all('img')
+    images = get_index(soup).images
     for img in images:
         # Check for srcset attribute
         if not img.get('srcset'):
@@ -106,23 +110,36 @@ def check_responsive_images(soup, base_url):
         'issues': issues
     }
 
-def analyze_mobile_friendliness(url):
-    """Analyze mobile-friendliness of a website."""
+def varies_by_user_agent(response):
+    """True if the server says the response depends on the User-Agent header."""
+    vary = response.headers.get('vary', '')
+    return any(field.strip().lower() in ('user-agent', '*') for field in vary.split(','))
+
+def analyze_mobile_friendliness(url, page=None):
+    """Analyze mobile-friendliness of a website.
+
+    The checks only inspect the markup, so a page already fetched for the
+    scan is reused unless its response varies by User-Agent; otherwise the
+    page is fetched with a mobile user agent.
+    """
     try:
-        # Use a mobile user agent
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1'
-        }
+        if page is None or varies_by_user_agent(page.response):
+            # Use a mobile user agent
+            headers = {'User-Agent': http_client.MOBILE_USER_AGENT}
+            page = fetch_page(url, headers=headers)
         
-        response = requests.get(url, headers=headers, timeout=20)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        def run_checks():
+            soup = page.soup
+            return {
+                'viewport': check_viewport(soup),
+                'font_sizes': check_font_sizes(soup),
+                'tap_targets': check_tap_targets(soup),
+                'responsive_images': check_responsive_images(soup, url)
+            }
         
-        results = {
-            'viewport': check_viewport(soup),
-            'font_sizes': check_font_sizes(soup),
-            'tap_targets': check_tap_targets(soup),
-            'responsive_images': check_responsive_images(soup, url)
-        }
+        # The checks only read the markup; image URLs also depend on the page URL
+        results = cached_result('mobile_testing', 2, body_digest(page.response), run_checks,
+                                args=(url, resolve_backend(page.parser)))
         
         # Calculate overall score
         issues_count = sum(1 for check in results.values() 
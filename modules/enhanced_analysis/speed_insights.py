@@ -3,23 +3,35 @@ Speed Insights Module
 Provides detailed performance analysis and optimization recommendations.
 """
 
-import requests
-from bs4 import BeautifulSoup
-import time
 from urllib.parse import urljoin
 import re
 from concurrent.futures import ThreadPoolExecutor
 
-def analyze_resource_size(url, resource_url):
-    """Analyze the size of a single resource."""
+from utils import http_client
+from utils.document_index import get_index
+from utils.page_context import fetch_page
+
+# Response headers recorded for every resource, by record key
+PROBED_HEADERS = {
+    'cache_control': 'cache-control',
+    'content_encoding': 'content-encoding',
+    'etag': 'etag',
+    'content_type': 'content-type'
+}
+
+def probe_resource(url, resource_url):
+    """HEAD a single resource once and record its size and headers."""
     try:
-        response = requests.head(urljoin(url, resource_url), timeout=10)
+        response = http_client.head(urljoin(url, resource_url))
         size = int(response.headers.get('content-length', 0))
-        return {
+        record = {
             'url': resource_url,
             'size': size,
             'size_kb': round(size / 1024, 2) if size else 0
         }
+        for key, header in PROBED_HEADERS.items():
+            record[key] = response.headers.get(header, '')
+        return record
     except Exception:
         return {
             'url': resource_url,
@@ -37,39 +49,45 @@ def check_resource_optimization(soup, base_url):
         'fonts': []
     }
     
+    index = get_index(soup)
+
     # Collect JavaScript files
-    for script in soup.find_all('script', src=True):
+    for script in index.scripts:
         resources['js'].append(script['src'])
     
     # Collect CSS files
-    for css in soup.find_all('link', rel='stylesheet'):
+    for css in index.stylesheets:
         resources['css'].append(css.get('href', ''))
     
     # Collect images
-    for img in soup.find_all('img'):
+    for img in index.images:
         resources['images'].append(img.get('src', ''))
     
     # Collect fonts
-    for font in soup.find_all('link', rel='preload', as_='font'):
+    for font in [link for link in index.links_with_rel('preload') if link.get('as') == 'font']:
         resources['fonts'].append(font.get('href', ''))
     
-    # Analyze resource sizes in parallel
+    # Probe each distinct resource once, in parallel
     with ThreadPoolExecutor(max_workers=10) as executor:
-        results = {}
-        for resource_type, urls in resources.items():
-            results[resource_type] = list(executor.map(
-                lambda url: analyze_resource_size(base_url, url),
-                urls
-            ))
-    
-    return results
+        probes = {}
+        for urls in resources.values():
+            for url in urls:
+                if url not in probes:
+                    probes[url] = executor.submit(probe_resource, base_url, url)
+        
+        return {
+            resource_type: [probes[url].result() for url in urls]
+            for resource_type, urls in resources.items()
+        }
 
 def analyze_render_blocking_resources(soup):
     """Analyze render-blocking resources."""
     blocking_resources = []
     
+    index = get_index(soup)
+
     # Check for render-blocking CSS
-    for css in soup.find_all('link', rel='stylesheet'):
+    for css in index.stylesheets:
         if not css.get('media') or css['media'] == 'all':
             blocking_resources.append({
                 'type': 'css',
@@ -78,7 +96,7 @@ def analyze_render_blocking_resources(soup):
             })
     
     # Check for render-blocking JavaScript
-    for script in soup.find_all('script', src=True):
+    for script in index.scripts:
         if not script.get('async') and not script.get('defer'):
             blocking_resources.append({
                 'type': 'javascript',
@@ -88,43 +106,41 @@ def analyze_render_blocking_resources(soup):
     
     return blocking_resources
 
-def check_caching_headers(url, resources):
-    """Check caching headers for resources."""
+def check_caching_headers(resources):
+    """Check caching headers recorded by check_resource_optimization."""
     caching_issues = []
     
     for resource_type, resource_list in resources.items():
         for resource in resource_list:
-            try:
-                response = requests.head(urljoin(url, resource['url']), timeout=10)
-                cache_control = response.headers.get('cache-control', '')
-                
-                if not cache_control:
-                    caching_issues.append({
-                        'type': resource_type,
-                        'url': resource['url'],
-                        'issue': 'No cache-control header',
-                        'recommendation': 'Add cache-control headers'
-                    })
-                elif 'no-cache' in cache_control or 'no-store' in cache_control:
-                    caching_issues.append({
-                        'type': resource_type,
-                        'url': resource['url'],
-                        'issue': 'Caching disabled',
-                        'recommendation': 'Enable caching for static resources'
-                    })
-            except Exception:
+            if 'error' in resource:
                 continue
+            cache_control = resource['cache_control']
+            
+            if not cache_control:
+                caching_issues.append({
+                    'type': resource_type,
+                    'url': resource['url'],
+                    'issue': 'No cache-control header',
+                    'recommendation': 'Add cache-control headers'
+                })
+            elif 'no-cache' in cache_control or 'no-store' in cache_control:
+                caching_issues.append({
+                    'type': resource_type,
+                    'url': resource['url'],
+                    'issue': 'Caching disabled',
+                    'recommendation': 'Enable caching for static resources'
+                })
     
     return caching_issues
 
-def analyze_speed(url):
+def analyze_speed(url, page=None):
     """Analyze website speed and performance."""
     try:
-        start_time = time.time()
-        response = requests.get(url, timeout=20)
-        load_time = time.time() - start_time
+        if page is None:
+            page = fetch_page(url)
+        load_time = page.timings['fetch']
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = page.soup
         
         # Analyze resources
         resource_analysis = check_resource_optimization(soup, url)
@@ -133,7 +149,7 @@ def analyze_speed(url):
         blocking_resources = analyze_render_blocking_resources(soup)
         
         # Check caching
-        caching_issues = check_caching_headers(url, resource_analysis)
+        caching_issues = check_caching_headers(resource_analysis)
         
         # Calculate total resource sizes
         total_sizes = {
@@ -3,6 +3,10 @@ On-Page SEO Analysis Module
 Handles analysis of title tags, meta descriptions, and heading structure.
 """
 
+from utils.analysis_cache import memoize_on_body
+from utils.document_index import get_index
+from utils.document_text import get_document_text
+
 def analyze_title(title_tag):
     """Analyze the title tag."""
     if not title_tag:
@@ -53,9 +57,10 @@ def analyze_meta_description(meta_description):
 
 def analyze_headers(soup):
     """Analyze header tag structure."""
-    h1_tags = soup.find_all('h1')
-    h2_tags = soup.find_all('h2')
-    h3_tags = soup.find_all('h3')
+    headings = get_index(soup).headings
+    h1_tags = headings['h1']
+    h2_tags = headings['h2']
+    h3_tags = headings['h3']
     
     # Check header hierarchy
     if len(h1_tags) == 1 and len(h2_tags) > 0:
@@ -69,14 +74,16 @@ def analyze_headers(soup):
         'h1_count': len(h1_tags),
         'h2_count': len(h2_tags),
         'h3_count': len(h3_tags),
-        'h1_text': [tag.text for tag in h1_tags[:3]],  # First 3 H1 tags
+        'h1_text': get_document_text(soup).blocks('h1')[:3],  # First 3 H1 tags
         'status': status
     }
 
+@memoize_on_body('on_page_seo', version=3)
 def analyze(response, soup):
     """Analyze on-page SEO elements."""
-    title_tag = soup.find('title')
-    meta_description = soup.find('meta', attrs={'name': 'description'})
+    index = get_index(soup)
+    title_tag = index.find('title')
+    meta_description = index.meta('description')
     
     title_analysis = analyze_title(title_tag)
     meta_analysis = analyze_meta_description(meta_description)
@@ -3,11 +3,22 @@ Rank Analysis Module
 Handles website ranking analysis using various metrics and sources.
 """
 
-import requests
 from urllib.parse import urlparse
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from utils import http_client
+from utils.domain_facts import cached_fact
+
+def check_google_index(domain):
+    """Return "Indexed" or "Not indexed" from a Google site: query."""
+    google_url = f"https://www.google.com/search?q=site:{domain}"
+    response = http_client.get(google_url)
+    if "did not match any documents" in response.text.lower():
+        return "Not indexed"
+    return "Indexed"
+
 def get_domain_metrics(url):
     """Get domain metrics including authority and backlinks."""
     parsed_url = urlparse(url)
@@ -30,17 +41,9 @@ def get_domain_metrics(url):
         }
 
     try:
-        # Check for basic site indexing in Google
-        google_url = f"https://www.google.com/search?q=site:{domain}"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(google_url, headers=headers, timeout=10)
-        if "did not match any documents" in response.text.lower():
-            google_indexed = "Not indexed"
-        else:
-            google_indexed = "Indexed"
-    except:
+        # Check for basic site indexing in Google, once per domain per TTL
+        google_indexed = cached_fact(domain, 'google_index_status', lambda: check_google_index(domain))
+    except Exception:
         google_indexed = "Check failed"
 
     return {
@@ -49,6 +52,10 @@ def get_domain_metrics(url):
         "domain_metrics": moz_data
     }
 
+def probe_profile(profile_url):
+    """Return True if a social profile URL answers 200."""
+    return http_client.head(profile_url).status_code == 200
+
 def analyze_social_signals(url):
     """Analyze social media presence and signals."""
     parsed_url = urlparse(url)
@@ -61,30 +68,25 @@ def analyze_social_signals(url):
         {'name': 'Instagram', 'url': f'https://www.instagram.com/{domain}'}
     ]
     
-    social_presence = []
-    for platform in social_platforms:
+    def check(platform):
         try:
-            response = requests.head(platform['url'], timeout=5)
-            if response.status_code == 200:
-                social_presence.append({
-                    'platform': platform['name'],
-                    'status': 'Found',
-                    'url': platform['url']
-                })
-            else:
-                social_presence.append({
-                    'platform': platform['name'],
-                    'status': 'Not found',
-                    'url': None
-                })
-        except:
-            social_presence.append({
+            # A profile is a fact about the domain, cached across scans
+            found = cached_fact(domain, f"social:{platform['name']}", lambda: probe_profile(platform['url']))
+        except Exception:
+            return {
                 'platform': platform['name'],
                 'status': 'Check failed',
                 'url': None
-            })
+            }
+        return {
+            'platform': platform['name'],
+            'status': 'Found' if found else 'Not found',
+            'url': platform['url'] if found else None
+        }
     
-    return social_presence
+    # Probe the platforms concurrently
+    with ThreadPoolExecutor(max_workers=len(social_platforms)) as executor:
+        return list(executor.map(check, social_platforms))
 
 def get_estimated_traffic(domain):
     """Get estimated traffic data."""
@@ -6,16 +6,22 @@ Handles analysis of structured data implementation.
 import json
 from bs4 import BeautifulSoup
 
+from utils.analysis_cache import memoize_on_body
+from utils.document_index import get_index
+
 def analyze_schema_implementation(soup):
     """Analyze schema markup implementation."""
+    index = get_index(soup)
+
     # Look for JSON-LD schema
-    schema_scripts = soup.find_all('script', type='application/ld+json')
+    schema_scripts = [script for script in index.find_all('script')
+                      if script.get('type') == 'application/ld+json']
     
     # Look for Microdata schema
-    microdata_elements = soup.find_all(attrs={"itemtype": True})
+    microdata_elements = index.with_attr('itemtype')
     
     # Look for RDFa schema
-    rdfa_elements = soup.find_all(attrs={"typeof": True})
+    rdfa_elements = index.with_attr('typeof')
     
     schemas_found = []
     invalid_schemas = []
@@ -70,6 +76,7 @@ def analyze_schema_implementation(soup):
             'details': schemas_found
         }
 
+@memoize_on_body('schema_markup', version=2)
 def analyze(response, soup):
     """Analyze schema markup aspects."""
     implementation_analysis = analyze_schema_implementation(soup)
@@ -3,7 +3,7 @@ Security Analysis Module
 Handles analysis of HTTPS and mixed content.
 """
 
-from bs4 import BeautifulSoup
+from utils.document_index import get_index
 
 def analyze_https(url):
     """Analyze HTTPS configuration."""
@@ -29,26 +29,28 @@ def analyze_mixed_content(response, soup):
     mixed_active = []
     mixed_passive = []
     
+    index = get_index(soup)
+
     # Check scripts
-    for script in soup.find_all('script', src=True):
+    for script in index.scripts:
         src = script['src']
         if src.startswith('http://'):
             mixed_active.append(('script', src))
     
     # Check stylesheets
-    for link in soup.find_all('link', rel='stylesheet', href=True):
+    for link in [link for link in index.stylesheets if link.get('href') is not None]:
         href = link['href']
         if href.startswith('http://'):
             mixed_active.append(('stylesheet', href))
     
     # Check images
-    for img in soup.find_all('img', src=True):
+    for img in [img for img in index.images if img.get('src') is not None]:
         src = img['src']
         if src.startswith('http://'):
             mixed_passive.append(('image', src))
     
     # Check media elements
-    for media in soup.find_all(['audio', 'video'], src=True):
+    for media in [media for media in index.find_all('audio', 'video') if media.get('src') is not None]:
         src = media['src']
         if src.startswith('http://'):
             mixed_passive.append(('media', src))
@@ -70,10 +72,10 @@ def analyze_mixed_content(response, soup):
         'message': "No mixed content found"
     }
 
-def analyze(response, url):
+def analyze(response, soup, url):
     """Analyze security aspects."""
     https_analysis = analyze_https(url)
-    mixed_content_analysis = analyze_mixed_content(response, BeautifulSoup(response.text, 'html.parser'))
+    mixed_content_analysis = analyze_mixed_content(response, soup)
     
     return {
         'HTTPS': {
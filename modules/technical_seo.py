@@ -4,42 +4,44 @@ Handles all technical SEO checks including load time, status codes, and response
 """
 
 import os
-import requests
 from urllib.parse import urlparse
 from bs4 import BeautifulSoup
-import xml.etree.ElementTree as ET
 from datetime import datetime
 
+from utils.charset import response_text
+from utils.document_index import get_index
+from utils.robots import get_robots
+from utils.sitemap_writer import iter_urlset
+from utils.sitemaps import find_sitemap
+
 def check_robots_txt(url):
     """Check for robots.txt file and its configuration."""
     parsed_url = urlparse(url)
-    robots_url = f"{parsed_url.scheme}://{parsed_url.netloc}/robots.txt"
     base_domain = parsed_url.netloc
     
-    try:
-        response = requests.get(robots_url, timeout=10)
-        if response.status_code == 200:
-            content = response.text.lower()
+    robots = get_robots(url)
+    if robots.status_code is not None:
+        if robots.found:
             # Check for complete site blocking
-            if 'disallow: /' in content and not any(line.strip().startswith('allow: /') for line in content.splitlines()):
+            if not robots.is_allowed(f"{parsed_url.scheme}://{base_domain}/"):
                 return {
                     "status": "warning",
                     "message": "Present but blocking all content",
-                    "content": response.text,
+                    "content": robots.content,
                     "needs_creation": False
                 }
             # Check for sitemap reference
-            if 'sitemap:' not in content:
+            if not robots.sitemaps:
                 return {
                     "status": "warning",
                     "message": "Present but missing sitemap reference",
-                    "content": response.text,
+                    "content": robots.content,
                     "needs_creation": False
                 }
             return {
                 "status": "success",
                 "message": "Present and properly configured",
-                "content": response.text,
+                "content": robots.content,
                 "needs_creation": False
             }
         return {
@@ -58,12 +60,11 @@ Sitemap: {parsed_url.scheme}://{base_domain}/sitemap.xml
 # Disallow: /includes/""",
             "needs_creation": True
         }
-    except:
-        return {
-            "status": "error",
-            "message": "Not accessible",
-            "needs_creation": True,
-            "suggested_content": f"""User-agent: *
+    return {
+        "status": "error",
+        "message": "Not accessible",
+        "needs_creation": True,
+        "suggested_content": f"""User-agent: *
 Allow: /
 
 # Allow crawling of all content
@@ -74,7 +75,7 @@ Sitemap: {parsed_url.scheme}://{base_domain}/sitemap.xml
 # Disallow: /private/
 # Disallow: /tmp/
 # Disallow: /includes/"""
-        }
+    }
 
 def check_sitemap(url, soup):
     """Check for sitemap.xml file and its configuration."""
@@ -88,20 +89,11 @@ def check_sitemap(url, soup):
         f"{base_url}/sitemap/sitemap.xml"
     ]
     
-    # Also check robots.txt for Sitemap directive
-    robots_url = f"{base_url}/robots.txt"
-    try:
-        robots_response = requests.get(robots_url, timeout=10)
-        if robots_response.status_code == 200:
-            for line in robots_response.text.splitlines():
-                if line.lower().startswith('sitemap:'):
-                    sitemap_url = line.split(':', 1)[1].strip()
-                    sitemap_locations.insert(0, sitemap_url)
-    except:
-        pass
+    # Sitemaps declared in robots.txt come first
+    sitemap_locations = get_robots(url).sitemaps + sitemap_locations
 
     # Get all URLs from the current page
-    page_urls = [a.get('href') for a in soup.find_all('a', href=True)]
+    page_urls = [a.get('href') for a in get_index(soup).links if a.get('href') is not None]
     page_urls = [url for url in page_urls if url.startswith('/') or url.startswith(base_url)]
     
     # Convert relative URLs to absolute
@@ -110,31 +102,25 @@ def check_sitemap(url, soup):
     # Remove duplicates and fragments
     page_urls = list(set([url.split('#')[0] for url in page_urls]))
     
-    # Check each potential sitemap location
-    for sitemap_url in sitemap_locations:
-        try:
-            response = requests.get(sitemap_url, timeout=10)
-            if response.status_code == 200:
-                try:
-                    # Try to parse as XML to validate structure
-                    ET.fromstring(response.content)
-                    return {
-                        "status": "success",
-                        "message": "Present and valid XML",
-                        "content": response.text,
-                        "needs_creation": False,
-                        "url": sitemap_url
-                    }
-                except ET.ParseError:
-                    return {
-                        "status": "warning",
-                        "message": "Present but invalid XML format",
-                        "content": response.text,
-                        "needs_creation": True,
-                        "suggested_content": generate_sitemap_content(base_url, page_urls)
-                    }
-        except:
-            continue
+    # Probe every location at once and read the first one that exists
+    sitemap = find_sitemap(sitemap_locations)
+    if sitemap is not None:
+        if sitemap['valid']:
+            result = {
+                "status": "success",
+                "message": "Present and valid XML",
+                "needs_creation": False
+            }
+            for key in ('url', 'type', 'url_count', 'sitemap_count'):
+                if key in sitemap:
+                    result[key] = sitemap[key]
+            return result
+        return {
+            "status": "warning",
+            "message": "Present but invalid XML format",
+            "needs_creation": True,
+            "suggested_content": generate_sitemap_content(base_url, page_urls)
+        }
     
     # If no sitemap found, suggest creation
     return {
@@ -148,36 +134,20 @@ def generate_sitemap_content(base_url, urls):
     """Generate sitemap.xml content based on discovered URLs."""
     current_date = datetime.now().strftime("%Y-%m-%d")
     
-    sitemap_content = """<?xml version="1.0" encoding="UTF-8"?>
-<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-"""
-    
-    # Add base URL
-    sitemap_content += f"""    <url>
-        <loc>{base_url}</loc>
-        <lastmod>{current_date}</lastmod>
-        <changefreq>weekly</changefreq>
-        <priority>1.0</priority>
-    </url>
-"""
-    
-    # Add discovered URLs
-    for url in urls:
-        sitemap_content += f"""    <url>
-        <loc>{url}</loc>
-        <lastmod>{current_date}</lastmod>
-        <changefreq>monthly</changefreq>
-        <priority>0.8</priority>
-    </url>
-"""
+    # Base URL first, then the discovered URLs
+    entries = [{'loc': base_url, 'lastmod': current_date, 'changefreq': 'weekly', 'priority': '1.0'}]
+    entries += [
+        {'loc': url, 'lastmod': current_date, 'changefreq': 'monthly', 'priority': '0.8'}
+        for url in urls
+    ]
     
-    sitemap_content += "</urlset>"
-    return sitemap_content
+    return ''.join(iter_urlset(entries))
 
 def check_mobile_friendly(response):
     """Check if the site appears to be mobile friendly."""
-    viewport_meta = response.text.lower().find('name="viewport"')
-    responsive_meta = response.text.lower().find('media="screen and (')
+    html = response_text(response).lower()
+    viewport_meta = html.find('name="viewport"')
+    responsive_meta = html.find('media="screen and (')
     if viewport_meta > -1 or responsive_meta > -1:
         return "Yes"
     return "No"
@@ -213,8 +183,10 @@ def analyze(response, soup):
         
     if sitemap_check.get('suggested_content'):
         results['Sitemap.xml']['suggested_content'] = sitemap_check['suggested_content']
-    elif sitemap_check.get('content'):
-        results['Sitemap.xml']['content'] = sitemap_check['content']
+    else:
+        for key in ('url', 'type', 'url_count', 'sitemap_count'):
+            if key in sitemap_check:
+                results['Sitemap.xml'][key] = sitemap_check[key]
     
     # Add load time rating based on modern performance standards
     if load_time < 1:
@@ -3,9 +3,12 @@ User Experience Analysis Module
 Handles analysis of mobile viewport, font sizes, and tap targets.
 """
 
+from utils.analysis_cache import memoize_on_body
+from utils.document_index import get_index
+
 def analyze_viewport(soup):
     """Analyze viewport configuration."""
-    viewport_meta = soup.find('meta', attrs={'name': 'viewport'})
+    viewport_meta = get_index(soup).meta('viewport')
     if not viewport_meta:
         return {
             'status': "bad",
@@ -26,7 +29,7 @@ def analyze_viewport(soup):
 def analyze_font_sizes(soup):
     """Analyze font sizes used in the content."""
     # Get all elements with font-size style or CSS classes commonly used for text
-    text_elements = soup.find_all(['p', 'div', 'span', 'a', 'li'])
+    text_elements = get_index(soup).find_all('p', 'div', 'span', 'a', 'li')
     font_sizes = []
     
     for elem in text_elements:
@@ -61,7 +64,7 @@ def analyze_font_sizes(soup):
 
 def analyze_tap_targets(soup):
     """Analyze tap target sizes and spacing."""
-    clickable_elements = soup.find_all(['a', 'button', 'input', 'select', 'textarea'])
+    clickable_elements = get_index(soup).find_all('a', 'button', 'input', 'select', 'textarea')
     small_targets = []
     
     for elem in clickable_elements:
@@ -98,6 +101,7 @@ def analyze_tap_targets(soup):
             'message': f"Many tap targets ({len(small_targets)}) are too small"
         }
 
+@memoize_on_body('user_experience', version=2)
 def analyze(response, soup, url):
     """Analyze user experience aspects."""
     viewport_analysis = analyze_viewport(soup)
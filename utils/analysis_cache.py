@@ -0,0 +1,162 @@
+"""
+Analysis Cache
+Memoizes analyzers whose result depends only on the page body.
+
+Results are keyed by a SHA-256 hash of the response body together with the
+analyzer's name and version and the HTML parser backend that built the
+soup, so an unchanged page, or two sites built from the same template, are
+analyzed once per backend. Bump an analyzer's version whenever its output
+changes so stale results are not served.
+
+Results are held as JSON in an in-memory LRU of ANALYZER_CACHE_SIZE entries
+per worker process. Every hit returns a fresh copy that the caller may
+modify. Set ANALYZER_CACHE_DIR to also keep them on disk, shared by all
+workers and kept across restarts; the oldest files are removed once there
+are more than ANALYZER_CACHE_DISK_ENTRIES. Setting ENABLED to False (or
+ANALYZER_CACHE=0) runs every analyzer afresh, as benchmarks need.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('ANALYZER_CACHE', '1') != '0'
+CACHE_SIZE = int(os.environ.get('ANALYZER_CACHE_SIZE', 256))
+CACHE_DIR = os.environ.get('ANALYZER_CACHE_DIR')
+DISK_ENTRIES = int(os.environ.get('ANALYZER_CACHE_DISK_ENTRIES', 10000))
+
+# Disk writes between two prunes of the cache directory
+_PRUNE_EVERY = 100
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+_writes = 0
+
+
+def body_digest(response):
+    """Return the SHA-256 hex digest of a response body, computed once per response."""
+    digest = getattr(response, '_body_digest', None)
+    if digest is None:
+        digest = hashlib.sha256(response.content).hexdigest()
+        response._body_digest = digest
+    return digest
+
+
+def _cache_key(name, version, digest, args):
+    raw = json.dumps([name, version, digest, list(args)], default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _disk_path(key):
+    return os.path.join(CACHE_DIR, key[:2], key + '.json')
+
+
+def _load(key):
+    with _lock:
+        data = _memory.get(key)
+        if data is not None:
+            _memory.move_to_end(key)
+            return data
+    if CACHE_DIR:
+        try:
+            with open(_disk_path(key), encoding='utf-8') as f:
+                data = f.read()
+        except OSError:
+            return None
+        _remember(key, data)
+        return data
+    return None
+
+
+def _remember(key, data):
+    with _lock:
+        _memory[key] = data
+        _memory.move_to_end(key)
+        while len(_memory) > CACHE_SIZE:
+            _memory.popitem(last=False)
+
+
+def _prune_disk():
+    """Delete the oldest cache files beyond DISK_ENTRIES."""
+    files = []
+    for root, dirs, names in os.walk(CACHE_DIR):
+        for filename in names:
+            if filename.endswith('.json'):
+                path = os.path.join(root, filename)
+                try:
+                    files.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+    files.sort()
+    for mtime, path in files[:max(0, len(files) - DISK_ENTRIES)]:
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+
+
+def _store(key, data):
+    global _writes
+    _remember(key, data)
+    if not CACHE_DIR:
+        return
+    path = _disk_path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary name first so readers never see a partial file
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write analysis cache file {path}: {e}")
+        return
+    with _lock:
+        _writes += 1
+        prune = _writes % _PRUNE_EVERY == 0
+    if prune:
+        _prune_disk()
+
+
+def cached_result(name, version, digest, compute, args=()):
+    """Return compute() for this body digest, from the cache when possible.
+
+    args lists anything besides the body that the result depends on, such as
+    the page URL. A result that is not JSON-serializable is returned
+    without being cached.
+    """
+    if not ENABLED:
+        return compute()
+    key = _cache_key(name, version, digest, args)
+    data = _load(key)
+    if data is None:
+        result = compute()
+        try:
+            data = json.dumps(result)
+        except TypeError as e:
+            logger.warning(f"Not caching {name}: {e}")
+            return result
+        _store(key, data)
+    return json.loads(data)
+
+
+def memoize_on_body(name, version=1):
+    """Memoize an analyzer called as func(response, soup, ...) on the response body.
+
+    Only for analyzers whose result depends on nothing but the body and the
+    parser backend that built the soup; further arguments are not part of
+    the key.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(response, soup, *args):
+            return cached_result(name, version, body_digest(response), lambda: func(response, soup, *args),
+                                 args=(soup.builder.NAME,))
+        return wrapper
+    return decorator
@@ -0,0 +1,78 @@
+"""
+Analysis Runner
+Runs independent analyzers concurrently and merges their results in a fixed order.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# Upper bound on analyzer threads used by a single scan
+MAX_WORKERS = int(os.environ.get('ANALYSIS_WORKERS', 8))
+
+
+def timed_out_result(deadline):
+    """Result recorded for an analyzer that missed its deadline."""
+    return {
+        'status': 'timeout',
+        'message': f"Analysis timed out after {deadline} seconds"
+    }
+
+
+def run_analyzers(tasks, max_workers=MAX_WORKERS, deadlines=None, on_result=None):
+    """Run analyzers concurrently and return their results keyed by name.
+
+    tasks is a list of (name, func, args) tuples. Results come back in the
+    same order as the tasks regardless of which analyzer finishes first. An
+    exception raised by an analyzer is re-raised here, as if it had been
+    called directly.
+
+    deadlines optionally maps task names to a number of seconds, counted from
+    when the tasks are submitted. An analyzer that misses its deadline is left
+    to finish in the background and its result is replaced by
+    timed_out_result(), so the other results are still returned.
+
+    on_result, if given, is called as on_result(name, result) on the calling
+    thread as soon as each result is known, in completion order.
+    """
+    if not tasks:
+        return {}
+
+    deadlines = deadlines or {}
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(tasks)))
+    try:
+        start = time.monotonic()
+        names = {executor.submit(func, *args): name for name, func, args in tasks}
+
+        results = {}
+
+        def record(name, result):
+            results[name] = result
+            if on_result is not None:
+                on_result(name, result)
+
+        pending = set(names)
+        while pending:
+            # Give up on analyzers whose deadline has passed
+            now = time.monotonic()
+            for future in list(pending):
+                deadline = deadlines.get(names[future])
+                if deadline is not None and not future.done() and now >= start + deadline:
+                    future.cancel()
+                    pending.discard(future)
+                    record(names[future], timed_out_result(deadline))
+            if not pending:
+                break
+
+            # Wait for the next result, but no longer than the nearest deadline
+            remaining = [start + deadlines[names[future]] - now
+                         for future in pending if names[future] in deadlines]
+            timeout = max(0, min(remaining)) if remaining else None
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                record(names[future], future.result())
+
+        return {name: results[name] for name, func, args in tasks}
+    finally:
+        # Don't block on analyzers that overran; their threads end on their own
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,92 @@
+"""
+Charset
+Decodes a fetched page once, choosing its encoding without scanning the body.
+
+The encoding is taken from, in order:
+- a UTF-8 or UTF-16 byte order mark;
+- the charset parameter of the Content-Type header;
+- a <meta charset>, <meta http-equiv="Content-Type"> or XML declaration in
+  the first SNIFF_BYTES bytes;
+- UTF-8 if the body decodes as UTF-8, otherwise windows-1252.
+
+response.text instead falls back to ISO-8859-1 for text/* pages without a
+charset, runs statistical detection over the whole body for other types, and
+decodes again on every access. response_text() keeps the decoded text on the
+response so every analyzer shares one copy.
+"""
+
+import codecs
+import re
+
+# Bytes searched for a <meta> charset declaration
+SNIFF_BYTES = 4096
+
+# Checked in this order; decoding with these codecs strips the mark
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+_HEADER_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([^\s;"\']+)', re.I)
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+?charset\s*=\s*["\']?\s*([\w.:+-]+)', re.I)
+_XML_ENCODING_RE = re.compile(rb'^\s*<\?xml[^>]+encoding\s*=\s*["\']([\w.:+-]+)', re.I)
+
+
+def _known(label):
+    """Return the codec name for an encoding label, or None if Python has no such codec."""
+    if isinstance(label, bytes):
+        label = label.decode('ascii', 'ignore')
+    try:
+        return codecs.lookup(label.strip()).name
+    except LookupError:
+        return None
+
+
+def sniff_encoding(head):
+    """Return the encoding declared in the first bytes of a document, or None."""
+    head = head[:SNIFF_BYTES]
+    match = _XML_ENCODING_RE.match(head) or _META_CHARSET_RE.search(head)
+    if match is None:
+        return None
+    encoding = _known(match.group(1))
+    # A document read as bytes cannot really be UTF-16 without a BOM
+    if encoding in ('utf-16', 'utf-16-le', 'utf-16-be'):
+        return 'utf-8'
+    return encoding
+
+
+def declared_encoding(content, content_type=''):
+    """Return the encoding given by a BOM, the header or the document, or None."""
+    for bom, encoding in _BOMS:
+        if content.startswith(bom):
+            return encoding
+
+    match = _HEADER_CHARSET_RE.search(content_type or '')
+    encoding = _known(match.group(1)) if match else None
+    if encoding is None:
+        encoding = sniff_encoding(content)
+    return encoding
+
+
+def decode_body(content, content_type=''):
+    """Return (text, encoding) for a response body, decoding it once."""
+    encoding = declared_encoding(content, content_type)
+    if encoding is not None:
+        return content.decode(encoding, errors='replace'), encoding
+    # Nothing declared: the UTF-8 attempt is the decode when it succeeds
+    try:
+        return content.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError:
+        return content.decode('cp1252', errors='replace'), 'cp1252'
+
+
+def response_text(response):
+    """Return the decoded body of a response, decoding it only once."""
+    text = getattr(response, '_decoded_text', None)
+    if text is None:
+        text, encoding = decode_body(response.content, response.headers.get('content-type', ''))
+        # Later uses of response.text then skip detection too
+        response.encoding = encoding
+        response._decoded_text = text
+    return text
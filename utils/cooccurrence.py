@@ -0,0 +1,92 @@
+"""
+Co-occurrence Index
+Finds the terms that appear close to given keywords in a text and ranks them
+by pointwise mutual information (PMI).
+
+The index works on the interned word ids of a TextStats, so the text is not
+turned back into a list of strings. Looking up the terms near a keyword only
+visits the windows around that keyword's occurrences, however long the text
+is.
+"""
+
+import math
+from collections import Counter
+
+import numpy as np
+
+from utils.keyword_counter import split_words
+
+# Words on either side of a keyword occurrence that count as "near" it
+DEFAULT_WINDOW = 10
+
+# Terms seen near a keyword fewer times than this are not suggested;
+# PMI overrates terms that only occur once
+DEFAULT_MIN_COUNT = 2
+
+
+class CooccurrenceIndex:
+    """Keyword neighbourhoods in the words of one TextStats."""
+
+    def __init__(self, stats, window=DEFAULT_WINDOW):
+        self.stats = stats
+        self.window = window
+        self._ids = np.frombuffer(stats.ids, dtype=np.intc)
+
+    def _keyword_ids(self, keyword):
+        """Return the word ids of keyword, or None if any of its words does not occur."""
+        word_ids = [self.stats.word_id(word) for word in split_words(keyword)]
+        if not word_ids or None in word_ids:
+            return None
+        return word_ids
+
+    def occurrences(self, keyword):
+        """Return the (start, end) word spans where keyword occurs."""
+        keyword_ids = self._keyword_ids(keyword)
+        if keyword_ids is None:
+            return []
+        ids = self._ids
+        starts = np.flatnonzero(ids == keyword_ids[0])
+        for offset, word_id in enumerate(keyword_ids[1:], 1):
+            starts = starts[starts + offset < len(ids)]
+            starts = starts[ids[starts + offset] == word_id]
+        length = len(keyword_ids)
+        return [(int(start), int(start) + length) for start in starts]
+
+    def neighbours(self, keyword):
+        """Return (Counter of word ids within the window of keyword, occurrence count)."""
+        counts = Counter()
+        ids = self.stats.ids
+        spans = self.occurrences(keyword)
+        for start, end in spans:
+            counts.update(ids[max(0, start - self.window):start])
+            counts.update(ids[end:end + self.window])
+        return counts, len(spans)
+
+    def related(self, keywords, limit=10, min_count=DEFAULT_MIN_COUNT, is_candidate=None):
+        """Return up to limit (term, score) pairs, most strongly associated first.
+
+        A term's score is its highest PMI with any of the keywords. Terms that
+        are part of a keyword are never suggested; is_candidate can filter
+        out others, such as stopwords.
+        """
+        vocabulary = self.stats.vocabulary
+        frequencies = self.stats.counts
+        total = self.stats.word_count
+        excluded = {self.stats.word_id(word) for keyword in keywords for word in split_words(keyword)}
+
+        scores = {}
+        for keyword in keywords:
+            counts, keyword_count = self.neighbours(keyword)
+            for word_id, together in counts.items():
+                if together < min_count or word_id in excluded:
+                    continue
+                term = vocabulary[word_id]
+                if is_candidate is not None and not is_candidate(term):
+                    continue
+                pmi = math.log2(together * total / (keyword_count * int(frequencies[word_id])))
+                if pmi > scores.get(term, (float('-inf'), 0))[0]:
+                    scores[term] = (pmi, together)
+
+        # Ties go to the term seen more often near the keywords, then alphabetical
+        ranked = sorted(scores.items(), key=lambda item: (-item[1][0], -item[1][1], item[0]))
+        return [(term, round(score[0], 3)) for term, score in ranked[:limit]]
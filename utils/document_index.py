@@ -0,0 +1,81 @@
+"""
+Document Index
+Walks a parsed document once and groups its elements so analyzers can look
+them up without searching the whole tree again.
+"""
+
+import threading
+from collections import defaultdict
+
+from bs4 import Tag
+
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+_lock = threading.Lock()
+
+
+class DocumentIndex:
+    """Elements of one parsed document, grouped by tag name in document order."""
+
+    def __init__(self, soup):
+        self.elements = []
+        self.by_tag = defaultdict(list)
+        self.outline = []
+
+        for element in soup.descendants:
+            if not isinstance(element, Tag):
+                continue
+            self.elements.append(element)
+            self.by_tag[element.name].append(element)
+            if element.name in HEADING_TAGS:
+                self.outline.append((int(element.name[1]), element))
+
+        self.headings = {name: self.by_tag.get(name, []) for name in HEADING_TAGS}
+        self.images = self.by_tag.get('img', [])
+        self.links = self.by_tag.get('a', [])
+        self.scripts = [script for script in self.by_tag.get('script', []) if script.get('src') is not None]
+        self.stylesheets = self.links_with_rel('stylesheet')
+
+        # First <meta name="..."> for each name, as soup.find() would return it
+        self.meta_by_name = {}
+        for meta in self.by_tag.get('meta', []):
+            name = meta.get('name')
+            if name is not None and name not in self.meta_by_name:
+                self.meta_by_name[name] = meta
+
+    def find_all(self, *names):
+        """Return the elements with any of the given tag names, in document order."""
+        if len(names) == 1:
+            return list(self.by_tag.get(names[0], []))
+        names = set(names)
+        return [element for element in self.elements if element.name in names]
+
+    def find(self, name):
+        """Return the first element with the given tag name, or None."""
+        elements = self.by_tag.get(name)
+        return elements[0] if elements else None
+
+    def meta(self, name):
+        """Return the first <meta> tag with the given name attribute, or None."""
+        return self.meta_by_name.get(name)
+
+    def with_attr(self, attr):
+        """Return every element that has the given attribute."""
+        return [element for element in self.elements if element.get(attr) is not None]
+
+    def links_with_rel(self, rel):
+        """Return the <link> tags whose rel attribute includes rel."""
+        return [link for link in self.by_tag.get('link', []) if rel in (link.get('rel') or [])]
+
+
+def get_index(soup):
+    """Return the index for a parsed document, building it on first use."""
+    # Read through __dict__: attribute lookups on a Tag fall back to a tree search
+    index = soup.__dict__.get('_document_index')
+    if index is None:
+        with _lock:
+            index = soup.__dict__.get('_document_index')
+            if index is None:
+                index = DocumentIndex(soup)
+                soup._document_index = index
+    return index
@@ -0,0 +1,95 @@
+"""
+Document Text
+Extracts the text of a parsed document once and shares it between the
+content analyzers.
+
+The tree is only read, never modified, so analyzers running in parallel on
+the same document all see the same markup. The contents of <script>,
+<style>, <template> and <noscript> tags are skipped while collecting the
+text; get_text() only leaves them out with some tree builders (html5lib
+returns script and style source as ordinary text).
+"""
+
+import threading
+
+from bs4 import CData, NavigableString, Tag
+
+from utils.document_index import get_index
+from utils.text_stats import TextStats
+
+_lock = threading.Lock()
+
+# Tags whose contents are never shown as page text
+HIDDEN_TAGS = frozenset(('script', 'style', 'template', 'noscript'))
+
+# String types get_text() returns by default; comments and doctypes are left out
+_TEXT_TYPES = (NavigableString, CData)
+
+
+def visible_text(element):
+    """Return the text of element, leaving out the contents of HIDDEN_TAGS."""
+    parts = []
+    stack = list(reversed(element.contents))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Tag):
+            if node.name not in HIDDEN_TAGS:
+                stack.extend(reversed(node.contents))
+        elif type(node) in _TEXT_TYPES:
+            parts.append(node)
+    return ''.join(parts)
+
+
+class DocumentText:
+    """Visible text, per-element text and text statistics of one parsed document."""
+
+    def __init__(self, soup):
+        self._soup = soup
+        self._visible_text = None
+        self._stats = None
+        self._blocks = {}
+        self._lock = threading.Lock()
+
+    @property
+    def visible_text(self):
+        """Text of the whole document without script, style and similar contents."""
+        if self._visible_text is None:
+            with self._lock:
+                if self._visible_text is None:
+                    self._visible_text = visible_text(self._soup)
+        return self._visible_text
+
+    @property
+    def stats(self):
+        """Word counts, sentence and paragraph lengths of the visible text."""
+        if self._stats is None:
+            text = self.visible_text
+            with self._lock:
+                if self._stats is None:
+                    self._stats = TextStats(text)
+        return self._stats
+
+    def blocks(self, name):
+        """Text of each element with the given tag name, in document order."""
+        texts = self._blocks.get(name)
+        if texts is None:
+            elements = get_index(self._soup).find_all(name)
+            with self._lock:
+                texts = self._blocks.get(name)
+                if texts is None:
+                    texts = [visible_text(element) for element in elements]
+                    self._blocks[name] = texts
+        return texts
+
+
+def get_document_text(soup):
+    """Return the text layer for a parsed document, building it on first use."""
+    # Read through __dict__: attribute lookups on a Tag fall back to a tree search
+    text = soup.__dict__.get('_document_text')
+    if text is None:
+        with _lock:
+            text = soup.__dict__.get('_document_text')
+            if text is None:
+                text = DocumentText(soup)
+                soup._document_text = text
+    return text
@@ -0,0 +1,99 @@
+"""
+Domain Facts
+Caches facts that depend only on a site's domain, such as its Google index
+status or social profiles, for all worker processes.
+
+Facts are stored as JSON in the usage tracking database with an expiry time,
+so scanning many pages of one site looks each fact up once per TTL instead
+of once per page. Within a process, concurrent requests for the same fact
+wait for the first lookup instead of repeating it.
+
+A lookup that raises is not cached, so a failed check is retried on the next
+scan. If the database cannot be used, facts are looked up without caching.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = 'usage_tracking.db'
+
+# Seconds a domain fact stays valid
+DEFAULT_TTL = int(os.environ.get('DOMAIN_FACTS_TTL', 24 * 60 * 60))
+
+_lock = threading.Lock()
+_fact_locks = {}
+
+
+def init_domain_facts_table():
+    """Create the domain facts table if it does not exist and drop expired facts."""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS domain_facts (
+            domain TEXT NOT NULL,
+            name TEXT NOT NULL,
+            value TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (domain, name)
+        )
+    ''')
+    c.execute('DELETE FROM domain_facts WHERE expires_at <= ?', (time.time(),))
+    conn.commit()
+    conn.close()
+
+
+def get_fact(domain, name):
+    """Return (True, value) for a stored fact that has not expired, else (False, None)."""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+        SELECT value FROM domain_facts
+        WHERE domain = ? AND name = ? AND expires_at > ?
+    ''', (domain.lower(), name, time.time()))
+    row = c.fetchone()
+    conn.close()
+    if row is None:
+        return False, None
+    return True, json.loads(row[0])
+
+
+def set_fact(domain, name, value, ttl=DEFAULT_TTL):
+    """Store a fact about domain for ttl seconds."""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+        INSERT OR REPLACE INTO domain_facts (domain, name, value, expires_at)
+        VALUES (?, ?, ?, ?)
+    ''', (domain.lower(), name, json.dumps(value, default=str), time.time() + ttl))
+    conn.commit()
+    conn.close()
+
+
+def cached_fact(domain, name, lookup, ttl=DEFAULT_TTL):
+    """Return the stored fact, or call lookup() and store what it returns."""
+    key = (domain.lower(), name)
+    with _lock:
+        fact_lock = _fact_locks.setdefault(key, threading.Lock())
+
+    with fact_lock:
+        try:
+            found, value = get_fact(domain, name)
+        except sqlite3.Error as e:
+            logger.warning(f"Domain facts cache unavailable: {e}")
+            return lookup()
+        if found:
+            return value
+
+        value = lookup()
+        try:
+            set_fact(domain, name, value, ttl)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not cache {name} for {domain}: {e}")
+        return value
+
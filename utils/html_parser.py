@@ -0,0 +1,64 @@
+"""
+HTML Parser
+Builds BeautifulSoup documents with a selectable tree builder.
+
+html.parser ships with Python and is always available. lxml and html5lib are
+used when installed; asking for one that is missing falls back to the next
+backend in PREFERRED_BACKENDS order, so a missing lxml falls back to
+html.parser, not to the much slower html5lib. The backend used for scans is
+set with the HTML_PARSER environment variable.
+"""
+
+import logging
+import os
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+logger = logging.getLogger(__name__)
+
+# Fastest first. html5lib is by far the slowest and its trees differ most from
+# html.parser's, so it is only used when asked for explicitly
+PREFERRED_BACKENDS = ('lxml', 'html.parser', 'html5lib')
+
+DEFAULT_BACKEND = os.environ.get('HTML_PARSER', 'html.parser')
+
+_available = None
+_resolved = {}
+
+
+def available_backends():
+    """Return the installed backends in PREFERRED_BACKENDS order."""
+    global _available
+    if _available is None:
+        backends = []
+        for backend in PREFERRED_BACKENDS:
+            try:
+                BeautifulSoup('', backend)
+            except FeatureNotFound:
+                continue
+            backends.append(backend)
+        _available = tuple(backends)
+    return _available
+
+
+def resolve_backend(backend=None):
+    """Return backend if it is installed, otherwise the next installed fallback."""
+    backend = backend or DEFAULT_BACKEND
+    if backend in _resolved:
+        return _resolved[backend]
+    if backend not in PREFERRED_BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend: {backend}")
+
+    installed = available_backends()
+    # html.parser is always installed, so it ends every fallback chain
+    resolved = next((b for b in PREFERRED_BACKENDS[PREFERRED_BACKENDS.index(backend):] if b in installed),
+                    'html.parser')
+    if resolved != backend:
+        logger.warning(f"HTML parser backend {backend} is not installed, using {resolved}")
+    _resolved[backend] = resolved
+    return resolved
+
+
+def parse_html(markup, backend=None):
+    """Parse markup with the configured backend, or the given one."""
+    return BeautifulSoup(markup, resolve_backend(backend))
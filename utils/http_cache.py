@@ -0,0 +1,181 @@
+"""
+HTTP Cache
+Revalidates previously fetched pages instead of downloading them again.
+
+When HTTP_CACHE_DIR is set, 200 responses to GET requests that carry an ETag
+or Last-Modified validator are stored on disk with their body, per URL and
+User-Agent. The next GET of the same URL sends If-None-Match and
+If-Modified-Since; if the server answers 304 Not Modified, the stored body is
+returned as a normal 200 response, so only headers cross the network. Its
+elapsed time, and the fetch_time attribute set on it, are those of the last
+full download, so load times are not understated by the revalidation.
+Analyzers memoized on the body (see utils.analysis_cache) then reuse their
+results without parsing the page again.
+
+Stored responses are always revalidated, never served unchecked, so scans
+still see the site's current status and headers. Responses marked
+Cache-Control: no-store, streamed and ranged requests and bodies over
+HTTP_CACHE_MAX_BODY bytes are not cached. Entries are shared by all worker
+processes; the least recently used are removed once there are more than
+HTTP_CACHE_MAX_ENTRIES.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from utils import http_client
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.environ.get('HTTP_CACHE_DIR')
+MAX_ENTRIES = int(os.environ.get('HTTP_CACHE_MAX_ENTRIES', 5000))
+MAX_BODY = int(os.environ.get('HTTP_CACHE_MAX_BODY', 10 * 1024 * 1024))
+
+# Disk writes between two prunes of the cache directory
+_PRUNE_EVERY = 100
+
+# Part of every cache key; changing it retires entries in an older layout
+_FORMAT = 2
+
+# Headers of a 304 that describe the empty reply, not the stored body
+_BODY_HEADERS = ('content-length', 'content-encoding', 'transfer-encoding', 'content-range')
+
+_lock = threading.Lock()
+_writes = 0
+
+
+def _cache_key(url, user_agent):
+    raw = json.dumps([_FORMAT, url, user_agent])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(CACHE_DIR, key[:2], key + '.http')
+
+
+def _load(key):
+    """Return (meta, body) stored for key, or None."""
+    path = _entry_path(key)
+    try:
+        with open(path, 'rb') as f:
+            meta = json.loads(f.readline())
+            body = f.read()
+        # Mark the entry as recently used so pruning keeps it
+        os.utime(path)
+    except (OSError, ValueError):
+        return None
+    return meta, body
+
+
+def _is_cacheable(response):
+    if response.status_code != 200:
+        return False
+    if 'no-store' in response.headers.get('cache-control', '').lower():
+        return False
+    if not (response.headers.get('etag') or response.headers.get('last-modified')):
+        return False
+    return len(response.content) <= MAX_BODY
+
+
+def _prune():
+    """Delete the least recently used entries beyond MAX_ENTRIES."""
+    files = []
+    for root, dirs, names in os.walk(CACHE_DIR):
+        for filename in names:
+            if filename.endswith('.http'):
+                path = os.path.join(root, filename)
+                try:
+                    files.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+    files.sort()
+    for mtime, path in files[:max(0, len(files) - MAX_ENTRIES)]:
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+
+
+def _store(key, response, fetch_time):
+    global _writes
+    meta = {
+        'url': response.url,
+        'status_code': response.status_code,
+        'reason': response.reason,
+        'encoding': response.encoding,
+        'headers': dict(response.headers),
+        'elapsed': response.elapsed.total_seconds(),
+        'fetch_time': fetch_time
+    }
+    path = _entry_path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary name first so readers never see a partial file
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(json.dumps(meta).encode('utf-8') + b'\n')
+            f.write(response.content)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write HTTP cache file {path}: {e}")
+        return
+    with _lock:
+        _writes += 1
+        prune = _writes % _PRUNE_EVERY == 0
+    if prune:
+        _prune()
+
+
+def _from_cache(meta, body, not_modified):
+    """Build the full response a 304 stands for from the stored entry."""
+    response = requests.Response()
+    response.status_code = meta['status_code']
+    response.reason = meta['reason']
+    response.url = meta['url']
+    response.encoding = meta['encoding']
+    response.headers = CaseInsensitiveDict(meta['headers'])
+    for name, value in not_modified.headers.items():
+        if name.lower() not in _BODY_HEADERS:
+            response.headers[name] = value
+    response._content = body
+    response.request = not_modified.request
+    response.history = not_modified.history
+    response.connection = not_modified.connection
+    # Timings of the full download, not of the 304
+    response.elapsed = timedelta(seconds=meta['elapsed'])
+    response.fetch_time = meta['fetch_time']
+    response.from_cache = True
+    return response
+
+
+def get(url, **kwargs):
+    """Send a GET through the shared session, revalidating a stored copy if there is one."""
+    headers = CaseInsensitiveDict(kwargs.pop('headers', None) or {})
+    if not CACHE_DIR or kwargs.get('stream') or 'range' in headers:
+        return http_client.get(url, headers=headers, **kwargs)
+
+    key = _cache_key(url, headers.get('user-agent', http_client.USER_AGENT))
+    entry = _load(key)
+    if entry is not None:
+        meta, body = entry
+        stored = CaseInsensitiveDict(meta['headers'])
+        if stored.get('etag'):
+            headers['If-None-Match'] = stored['etag']
+        if stored.get('last-modified'):
+            headers['If-Modified-Since'] = stored['last-modified']
+
+    start = time.time()
+    response = http_client.get(url, headers=headers, **kwargs)
+    if entry is not None and response.status_code == 304:
+        return _from_cache(meta, body, response)
+    if _is_cacheable(response):
+        _store(key, response, time.time() - start)
+    return response
@@ -0,0 +1,88 @@
+"""
+HTTP Client
+Shared, pooled HTTP session used by every analyzer module.
+
+All outgoing requests go through one keep-alive session per worker process so
+repeated requests to the same host reuse their TCP/TLS connections instead of
+opening a new one each time.
+"""
+
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = os.environ.get(
+    'SEO_USER_AGENT',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+)
+MOBILE_USER_AGENT = 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1'
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5, 10)
+PAGE_TIMEOUT = (5, 20)
+
+# Number of distinct hosts to keep pools for, and connections kept per host
+POOL_HOSTS = int(os.environ.get('HTTP_POOL_HOSTS', 32))
+POOL_PER_HOST = int(os.environ.get('HTTP_POOL_PER_HOST', 10))
+
+_session = None
+_session_pid = None
+_lock = threading.Lock()
+
+
+class _BlockAllCookies(DefaultCookiePolicy):
+    """Never keep cookies on the shared session so scans cannot leak state."""
+
+    def set_ok(self, cookie, request):
+        return False
+
+    def return_ok(self, cookie, request):
+        return False
+
+
+class _Session(requests.Session):
+    """Session that applies the default timeout when none is given."""
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+
+def _build_session():
+    session = _Session()
+    session.headers['User-Agent'] = USER_AGENT
+    session.cookies.set_policy(_BlockAllCookies())
+    # Up to POOL_PER_HOST connections per host are kept alive. A request that
+    # finds them all busy opens an extra one instead of waiting: requests gives
+    # urllib3 no pool timeout, so a blocking pool could wait forever on a stalled
+    # connection. Callers that fan out limit their own per-host concurrency.
+    adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_PER_HOST, pool_block=False)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session():
+    """Return the session for this worker process, creating it on first use."""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _lock:
+            if _session is None or _session_pid != pid:
+                # Never reuse sockets inherited from a parent process after a fork
+                _session = _build_session()
+                _session_pid = pid
+    return _session
+
+
+def get(url, **kwargs):
+    """Send a GET request through the shared session."""
+    return get_session().get(url, **kwargs)
+
+
+def head(url, **kwargs):
+    """Send a HEAD request through the shared session."""
+    return get_session().head(url, **kwargs)
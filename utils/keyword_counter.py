@@ -0,0 +1,107 @@
+"""
+Keyword Counter
+Counts many keywords and multi-word phrases in one pass over a text.
+
+Keywords are matched as whole words, case-insensitively, so "art" does not
+match inside "start". The phrases are held in a word trie, so the cost of a
+pass depends on the length of the text and the longest phrase, not on how
+many keywords are counted.
+
+Keywords containing punctuation, such as "c++" or "node.js", would lose it
+when split into words, so each of them is matched with its own regex instead,
+bounded by non-word characters.
+"""
+
+import re
+
+_WORD_RE = re.compile(r'\w+')
+
+# Trie key under which a node lists the keywords that end there
+_END = None
+
+
+def split_words(text):
+    """Lowercase text and split it into words."""
+    return _WORD_RE.findall(text.lower())
+
+
+def _keyword_pattern(keyword):
+    """Return a regex for a keyword that split_words() would change, or None."""
+    parts = keyword.lower().split()
+    if parts == split_words(keyword):
+        return None
+    phrase = r'\s+'.join(re.escape(part) for part in parts)
+    return re.compile(rf'(?<!\w){phrase}(?!\w)')
+
+
+class KeywordCounter:
+    """Counts a fixed set of keywords in any number of texts."""
+
+    def __init__(self, keywords):
+        # A keyword listed twice is still counted once per occurrence
+        self.keywords = list(dict.fromkeys(keywords))
+        self._trie = {}
+        self._patterns = {}
+        for keyword in self.keywords:
+            pattern = _keyword_pattern(keyword)
+            if pattern is not None:
+                self._patterns[keyword] = pattern
+                continue
+            words = split_words(keyword)
+            if not words:
+                continue
+            node = self._trie
+            for word in words:
+                node = node.setdefault(word, {})
+            node.setdefault(_END, []).append((keyword, len(words)))
+
+    def count_words(self, words):
+        """Return {keyword: occurrences} in a list of lowercased words.
+
+        Occurrences of the same keyword do not overlap, as with str.count().
+        Keywords with punctuation are only counted by count().
+        """
+        counts = dict.fromkeys(self.keywords, 0)
+        next_free = {}
+        for start in range(len(words)):
+            node = self._trie.get(words[start])
+            position = start + 1
+            while node is not None:
+                for keyword, length in node.get(_END, ()):
+                    if start >= next_free.get(keyword, 0):
+                        counts[keyword] += 1
+                        next_free[keyword] = start + length
+                if position == len(words):
+                    break
+                node = node.get(words[position])
+                position += 1
+        return counts
+
+    def count(self, text):
+        """Return ({keyword: occurrences}, word count) for text.
+
+        The word count is the number of whitespace-separated words.
+        """
+        counts = self.count_words(split_words(text))
+        if self._patterns:
+            lowered = text.lower()
+            for keyword, pattern in self._patterns.items():
+                counts[keyword] = sum(1 for _ in pattern.finditer(lowered))
+        return counts, len(text.split())
+
+
+def keyword_density(text, keywords, word_count=None):
+    """Return {keyword: {'count', 'density'}} with density in percent of all words.
+
+    word_count, if given, replaces the number of words in text as the total.
+    """
+    counts, text_words = KeywordCounter(keywords).count(text)
+    if word_count is None:
+        word_count = text_words
+    return {
+        keyword: {
+            'count': count,
+            'density': round((count / word_count) * 100, 2) if word_count > 0 else 0
+        }
+        for keyword, count in counts.items()
+    }
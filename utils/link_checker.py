@@ -0,0 +1,178 @@
+"""
+Link Checker
+Checks many links concurrently and remembers the answers.
+
+Each unique URL is checked once, with at most PER_HOST_LIMIT requests in
+flight to any one host, so a page with hundreds of links to the same site
+does not flood it. A HEAD request is tried first. Servers that reject or
+mishandle HEAD (HEAD_REJECTED statuses or a broken connection) get a GET for
+the first byte of the body instead; any other HEAD status is final.
+
+Results are cached per worker process for CACHE_TTL seconds, so links that
+many pages of a site share are checked once across scans. A failed request
+(timeout or connection error) may be a passing hiccup, so it is only cached
+for FAILURE_TTL seconds. A scan waits at
+most TIME_BUDGET seconds for its links. Checks still running after that
+finish in the background and fill the cache for the next scan.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urldefrag, urlparse
+
+import requests
+
+from utils import http_client
+
+# Checks run at the same time for one scan, and per host across all scans
+MAX_WORKERS = int(os.environ.get('LINK_CHECK_WORKERS', 16))
+PER_HOST_LIMIT = int(os.environ.get('LINK_CHECK_PER_HOST', 4))
+
+# Seconds a scan waits for its link checks
+TIME_BUDGET = float(os.environ.get('LINK_CHECK_BUDGET', 15))
+
+# Seconds a link status is reused, and the number of statuses kept
+CACHE_TTL = int(os.environ.get('LINK_CACHE_TTL', 3600))
+CACHE_SIZE = int(os.environ.get('LINK_CACHE_SIZE', 10000))
+
+# HEAD statuses that say the method was refused rather than that the link is broken
+HEAD_REJECTED = frozenset((403, 405, 501))
+
+# Seconds a failed request is remembered before the link is tried again
+FAILURE_TTL = 60
+
+# (connect, read) timeouts in seconds for a single check
+TIMEOUT = (3, 5)
+
+# Rate limiting says nothing about the link, so it is neither broken nor cached
+TOO_MANY_REQUESTS = 429
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+# host -> [semaphore, checks waiting or running]; dropped when no check uses it
+_host_limits = {}
+_host_lock = threading.Lock()
+
+_MISSING = object()
+
+
+def unique_links(urls):
+    """Return the URLs without fragments and duplicates, in their original order."""
+    return list(dict.fromkeys(urldefrag(url)[0] for url in urls))
+
+
+def is_broken(status):
+    """Return True if a status from check_links() means the link is broken."""
+    return status is None or (status >= 400 and status != TOO_MANY_REQUESTS)
+
+
+def _cached_status(url):
+    with _cache_lock:
+        entry = _cache.get(url)
+        if entry is None:
+            return _MISSING
+        status, checked_at = entry
+        ttl = FAILURE_TTL if status is None else CACHE_TTL
+        if time.monotonic() - checked_at > ttl:
+            del _cache[url]
+            return _MISSING
+        _cache.move_to_end(url)
+        return status
+
+
+def _cache_status(url, status):
+    if status == TOO_MANY_REQUESTS:
+        return
+    with _cache_lock:
+        _cache[url] = (status, time.monotonic())
+        _cache.move_to_end(url)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+@contextmanager
+def _host_slot(url):
+    """Hold one of the PER_HOST_LIMIT request slots for the host of url."""
+    host = urlparse(url).netloc.lower()
+    with _host_lock:
+        entry = _host_limits.get(host)
+        if entry is None:
+            entry = _host_limits[host] = [threading.BoundedSemaphore(PER_HOST_LIMIT), 0]
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _host_lock:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _host_limits[host]
+
+
+def _request_status(url):
+    """Return the HTTP status of url, or None if it cannot be fetched."""
+    try:
+        response = http_client.head(url, allow_redirects=True, timeout=TIMEOUT)
+        if response.status_code not in HEAD_REJECTED:
+            return response.status_code
+    except requests.Timeout:
+        return None
+    except requests.RequestException:
+        pass
+
+    # Some servers refuse HEAD or drop the connection; ask for one byte instead
+    try:
+        response = http_client.get(url, headers={'Range': 'bytes=0-0'}, stream=True,
+                                   allow_redirects=True, timeout=TIMEOUT)
+        response.close()
+        return response.status_code
+    except requests.RequestException:
+        return None
+
+
+def check_link(url):
+    """Return the HTTP status of url, from the cache when it is fresh."""
+    status = _cached_status(url)
+    if status is not _MISSING:
+        return status
+    with _host_slot(url):
+        status = _request_status(url)
+    _cache_status(url, status)
+    return status
+
+
+def check_links(urls, budget=TIME_BUDGET):
+    """Check urls concurrently and return {url: status} in page order.
+
+    The URLs are passed through unique_links() first. status is the HTTP
+    status code, or None if the request failed. URLs whose check has not
+    finished within budget seconds are left out of the result.
+    """
+    urls = unique_links(urls)
+    statuses = {}
+    pending = []
+    for url in urls:
+        status = _cached_status(url)
+        if status is _MISSING:
+            pending.append(url)
+        else:
+            statuses[url] = status
+
+    if pending:
+        executor = ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(pending)),
+                                      thread_name_prefix='link-check')
+        try:
+            futures = {executor.submit(check_link, url): url for url in pending}
+            done, not_done = wait(futures, timeout=budget)
+            for future in done:
+                statuses[futures[future]] = future.result()
+        finally:
+            # Checks that overran keep going in the background and fill the cache
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return {url: statuses[url] for url in urls if url in statuses}
@@ -0,0 +1,69 @@
+"""
+Page Context
+Fetches a page once per scan and shares the response, decoded text and parsed
+document with every analyzer.
+"""
+
+import threading
+import time
+
+from utils import http_cache, http_client
+from utils.charset import response_text
+from utils.html_parser import parse_html
+
+
+class PageContext:
+    """A fetched page shared by all analyzers taking part in one scan."""
+
+    def __init__(self, url, response, fetch_time, parser=None):
+        self.url = url
+        self.response = response
+        self.parser = parser
+        self.timings = {'fetch': fetch_time}
+        self._text = None
+        self._soup = None
+        self._lock = threading.Lock()
+
+    @property
+    def final_url(self):
+        """URL of the page after following redirects."""
+        return str(self.response.url)
+
+    @property
+    def status_code(self):
+        return self.response.status_code
+
+    @property
+    def text(self):
+        """Decoded body of the page, decoded only once (see utils.charset)."""
+        if self._text is None:
+            with self._lock:
+                if self._text is None:
+                    start = time.time()
+                    self._text = response_text(self.response)
+                    self.timings['decode'] = time.time() - start
+        return self._text
+
+    @property
+    def soup(self):
+        """Parsed document, built on first access and reused afterwards."""
+        if self._soup is None:
+            text = self.text
+            with self._lock:
+                if self._soup is None:
+                    start = time.time()
+                    self._soup = parse_html(text, self.parser)
+                    self.timings['parse'] = time.time() - start
+        return self._soup
+
+
+def fetch_page(url, timeout=http_client.PAGE_TIMEOUT, headers=None):
+    """Fetch a URL and wrap the response in a PageContext.
+
+    A page stored in the HTTP cache is revalidated rather than downloaded
+    again; its fetch time is then the one of its last full download.
+    """
+    start = time.time()
+    response = http_cache.get(url, timeout=timeout, headers=headers, allow_redirects=True)
+    fetch_time = time.time() - start
+    return PageContext(url, response, getattr(response, 'fetch_time', fetch_time))
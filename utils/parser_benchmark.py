@@ -0,0 +1,239 @@
+"""
+Parser Benchmark
+Compares the installed HTML parser backends on parse time and on whether every
+analyzer produces the same report output as with html.parser.
+
+Usage (from the project root):
+    python -m utils.parser_benchmark                 # generated pages, 50 KB to 2 MB
+    python -m utils.parser_benchmark page.html https://example.com/
+
+Pass saved pages or URLs to benchmark real-world markup. Analyzers that make
+network requests of their own are run too, so results for live URLs can
+differ between runs if the site changes in the meantime.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+import time
+
+import requests
+
+from modules import (
+    technical_seo,
+    on_page_seo,
+    content_seo,
+    user_experience,
+    security,
+    schema_markup,
+    advanced_content,
+    meta_keywords
+)
+from modules.enhanced_analysis.ai_recommendations import get_ai_recommendations
+from modules.enhanced_analysis.keywords import get_keyword_suggestions
+from modules.enhanced_analysis.mobile_testing import analyze_mobile_friendliness
+from modules.enhanced_analysis.speed_insights import analyze_render_blocking_resources
+from utils import analysis_cache
+from utils.html_parser import available_backends
+from utils.page_context import PageContext, fetch_page
+
+# Base URL for generated and local pages; .invalid never resolves, so
+# analyzers that follow links fail fast instead of reaching the network
+LOCAL_BASE_URL = 'https://example.invalid/'
+
+GENERATED_SIZES = (50_000, 250_000, 1_000_000, 2_000_000)
+
+REFERENCE_BACKEND = 'html.parser'
+
+WORDS = ('search engine optimization content ranking keyword page website traffic '
+         'visitors mobile speed performance structure heading link image quality '
+         'audience marketing strategy analysis report results growth').split()
+
+
+def _analyzers(url):
+    """(name, func(page)) pairs for every analyzer that reads the markup."""
+    return [
+        ('Technical SEO', lambda page: technical_seo.analyze(page.response, page.soup)),
+        ('On-Page SEO', lambda page: on_page_seo.analyze(page.response, page.soup)),
+        ('Content SEO', lambda page: content_seo.analyze(page.response, page.soup)),
+        ('User Experience', lambda page: user_experience.analyze(page.response, page.soup, url)),
+        ('Security', lambda page: security.analyze(page.response, page.soup, url)),
+        ('Schema Markup', lambda page: schema_markup.analyze(page.response, page.soup)),
+        ('Advanced Content', lambda page: advanced_content.analyze(page.response, page.soup)),
+        ('Meta Keywords', lambda page: meta_keywords.analyze(page.response, page.soup)),
+        ('keyword_suggestions', lambda page: get_keyword_suggestions(url, ['content', 'search'], page)),
+        ('ai_recommendations', lambda page: get_ai_recommendations(url, page)),
+        ('mobile_analysis', lambda page: analyze_mobile_friendliness(url, page)),
+        # The rest of analyze_speed() probes every resource over the network,
+        # which takes minutes on large pages and depends only on these URLs
+        ('speed_insights', lambda page: analyze_render_blocking_resources(page.soup))
+    ]
+
+
+def generate_page(size, seed=0):
+    """Build a page of roughly size bytes with the markup real pages tend to have.
+
+    Some paragraphs and list items are left unclosed, as they often are in
+    the wild, since that is where tree builders disagree.
+    """
+    rng = random.Random(seed)
+
+    def sentence(n):
+        return ' '.join(rng.choice(WORDS) for _ in range(n)).capitalize() + '.'
+
+    head = [
+        '<!DOCTYPE html>',
+        '<html lang="en"><head><meta charset="utf-8">',
+        '<title>Generated benchmark page for parser comparison</title>',
+        f'<meta name="description" content="{sentence(20)}">',
+        '<meta name="viewport" content="width=device-width, initial-scale=1">',
+        '<meta name="keywords" content="seo, content, ranking">',
+        '<link rel="stylesheet" href="/static/site.css">',
+        '<link rel="preload" href="/static/font.woff2" as="font">',
+        '<script src="/static/app.js"></script>',
+        '<script type="application/ld+json">{"@context": "https://schema.org", "@type": "WebPage"}</script>',
+        '</head><body>',
+        '<nav><ul><li><a href="/">Home</a><li><a href="/about">About</a><li><a href="/contact">Contact</a></ul></nav>',
+        f'<h1>{sentence(6)}</h1>'
+    ]
+    parts = list(head)
+    length = sum(len(part) for part in parts)
+    section = 0
+    while length < size:
+        section += 1
+        block = [
+            f'<section itemscope itemtype="https://schema.org/Article"><h2>{sentence(5)}</h2>',
+            f'<p>{sentence(40)} <a href="/article/{section}">{sentence(3)}</a></p>',
+            f'<p style="font-size: {rng.choice((10, 12, 14, 16))}px">{sentence(30)}',
+            f'<img src="/images/{section}.jpg"' + (' alt="illustration"' if section % 3 else '') + '>',
+            f'<h3>{sentence(4)}</h3><ul><li>{sentence(8)}<li>{sentence(8)}</ul>',
+            f'<div><span>{sentence(12)}</span> <a href="https://example.invalid/out/{section}" style="height: 30px">{sentence(2)}</a></div>',
+            '</section>'
+        ]
+        parts.extend(block)
+        length += sum(len(part) for part in block)
+    parts.append('<footer><p>Copyright &copy; Example</footer></body></html>')
+    return '\n'.join(parts)
+
+
+def _local_response(url, content):
+    """Wrap markup that was not fetched over HTTP in a Response."""
+    response = requests.Response()
+    response._content = content.encode('utf-8')
+    response.status_code = 200
+    response.url = url
+    response.encoding = 'utf-8'
+    response.headers['Content-Type'] = 'text/html; charset=utf-8'
+    return response
+
+
+def load_corpus(sources):
+    """Return (label, url, response, fetch_time) for each benchmark page."""
+    corpus = []
+    if not sources:
+        for size in GENERATED_SIZES:
+            content = generate_page(size)
+            corpus.append((f'generated {size // 1000} KB', LOCAL_BASE_URL, _local_response(LOCAL_BASE_URL, content), 0.0))
+        return corpus
+
+    for source in sources:
+        if source.startswith(('http://', 'https://')):
+            page = fetch_page(source)
+            corpus.append((source, source, page.response, page.timings['fetch']))
+        else:
+            with open(source, encoding='utf-8', errors='replace') as f:
+                content = f.read()
+            corpus.append((os.path.basename(source), LOCAL_BASE_URL, _local_response(LOCAL_BASE_URL, content), 0.0))
+    return corpus
+
+
+def _parse_time(response, backend, repeat):
+    """Best-of-repeat time to parse the page with backend, in seconds."""
+    best = None
+    for _ in range(repeat):
+        page = PageContext(response.url, response, 0.0, parser=backend)
+        page.text
+        start = time.perf_counter()
+        page.soup
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _report_output(url, response, fetch_time, backend):
+    """Run every analyzer on one parse and return their JSON-encoded results."""
+    page = PageContext(url, response, fetch_time, parser=backend)
+    outputs = {}
+    for name, func in _analyzers(url):
+        try:
+            # Some analyzers print their own errors; keep the summary readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = func(page)
+        except Exception as e:
+            result = {'exception': repr(e)}
+        outputs[name] = json.dumps(result, sort_keys=True, default=str)
+    return outputs
+
+
+def run(sources, backends=None, repeat=3):
+    """Benchmark the backends on the corpus and print a summary per page.
+
+    The analysis cache is switched off meanwhile, so every backend runs the
+    analyzers itself.
+    """
+    enabled = analysis_cache.ENABLED
+    analysis_cache.ENABLED = False
+    try:
+        return _run(sources, backends, repeat)
+    finally:
+        analysis_cache.ENABLED = enabled
+
+
+def _run(sources, backends, repeat):
+    installed = available_backends()
+    for backend in backends or ():
+        if backend not in installed:
+            print(f"Skipping {backend}: not installed")
+    backends = [backend for backend in backends or installed if backend in installed]
+    if REFERENCE_BACKEND not in backends:
+        backends = [REFERENCE_BACKEND] + backends
+
+    summary = {backend: {'time': 0.0, 'mismatches': 0} for backend in backends}
+    for label, url, response, fetch_time in load_corpus(sources):
+        print(f"\n{label} ({len(response.content) / 1024:.0f} KB)")
+        reference = _report_output(url, response, fetch_time, REFERENCE_BACKEND)
+        for backend in backends:
+            elapsed = _parse_time(response, backend, repeat)
+            outputs = reference if backend == REFERENCE_BACKEND else _report_output(url, response, fetch_time, backend)
+            differing = [name for name in reference if outputs[name] != reference[name]]
+            summary[backend]['time'] += elapsed
+            summary[backend]['mismatches'] += len(differing)
+            parity = 'identical' if not differing else 'differs: ' + ', '.join(differing)
+            print(f"  {backend:<12} parse {elapsed * 1000:9.1f} ms   {parity}")
+
+    print('\nTotal parse time')
+    for backend, totals in sorted(summary.items(), key=lambda item: item[1]['time']):
+        status = 'identical output' if not totals['mismatches'] else f"{totals['mismatches']} differing results"
+        print(f"  {backend:<12} {totals['time'] * 1000:9.1f} ms   {status}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare HTML parser backends on speed and report parity.')
+    parser.add_argument('sources', nargs='*', help='HTML files or URLs (default: generated pages)')
+    parser.add_argument('--backend', action='append', dest='backends',
+                        help='backend to include; repeat for several (default: all installed)')
+    parser.add_argument('--repeat', type=int, default=3, help='parses per page and backend (best time is kept)')
+    args = parser.parse_args()
+
+    # Analyzers log failed link checks and similar; only the summary matters here
+    logging.disable(logging.WARNING)
+    run(args.sources, args.backends, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+Robots
+Fetches each host's robots.txt once and answers whether URLs may be crawled.
+
+A parsed robots.txt is cached per host (scheme and netloc) for ROBOTS_TTL
+seconds and shared by every analyzer in the worker process. Concurrent
+requests for the same host wait for the first fetch instead of making their
+own. Failed fetches are cached for FAILURE_TTL seconds only.
+
+Matching follows RFC 9309:
+- The most specific user-agent group applies, falling back to '*'.
+- The longest matching rule wins, and Allow wins a tie.
+- '*' matches any run of characters and a trailing '$' anchors the end.
+- 4xx responses allow everything. 5xx responses and unreachable hosts
+  disallow everything.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from utils import http_cache
+from utils.charset import response_text
+
+# Seconds a fetched robots.txt is reused, and a failed fetch is remembered
+ROBOTS_TTL = int(os.environ.get('ROBOTS_CACHE_TTL', 3600))
+FAILURE_TTL = 60
+
+# Number of hosts whose robots.txt is kept
+CACHE_SIZE = int(os.environ.get('ROBOTS_CACHE_SIZE', 1000))
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_host_locks = {}
+
+
+def _compile_rule(pattern):
+    """Turn a robots.txt path pattern into a compiled regex."""
+    anchored = pattern.endswith('$')
+    if anchored:
+        pattern = pattern[:-1]
+    regex = '.*'.join(re.escape(part) for part in pattern.split('*'))
+    return re.compile(regex + ('$' if anchored else ''))
+
+
+def parse_robots(content):
+    """Parse robots.txt content into ({agent: [(allow, pattern)]}, sitemap URLs).
+
+    Agents are lowercased. Rules of repeated groups for the same agent are
+    merged, and empty Disallow lines, which allow everything, are dropped.
+    """
+    groups = {}
+    sitemaps = []
+    agents = []
+    in_rules = False
+    for line in content.splitlines():
+        line = line.split('#', 1)[0].strip()
+        if ':' not in line:
+            continue
+        field, value = line.split(':', 1)
+        field = field.strip().lower()
+        value = value.strip()
+
+        if field == 'user-agent':
+            # A user-agent line after rules starts a new group
+            if in_rules:
+                agents = []
+                in_rules = False
+            agent = value.lower()
+            agents.append(agent)
+            groups.setdefault(agent, [])
+        elif field in ('allow', 'disallow'):
+            in_rules = True
+            if value:
+                for agent in agents:
+                    groups[agent].append((field == 'allow', value))
+        elif field == 'sitemap':
+            if value:
+                sitemaps.append(value)
+    return groups, sitemaps
+
+
+class RobotsFile:
+    """The robots.txt of one host, parsed into per-user-agent matchers."""
+
+    def __init__(self, url, status_code=None, content=''):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.fetched_at = time.monotonic()
+        self.groups, self.sitemaps = parse_robots(content) if status_code == 200 else ({}, [])
+        self._matchers = {}
+
+    @property
+    def found(self):
+        """True if the host served a robots.txt."""
+        return self.status_code == 200
+
+    @property
+    def reachable(self):
+        """False if the fetch failed or the server answered with an error."""
+        return self.status_code is not None and self.status_code < 500
+
+    def _group_for(self, user_agent):
+        """Return the agent of the group that applies to user_agent, or None."""
+        user_agent = user_agent.lower()
+        matches = [agent for agent in self.groups if agent != '*' and agent in user_agent]
+        if matches:
+            return max(matches, key=len)
+        return '*' if '*' in self.groups else None
+
+    def _matcher(self, user_agent):
+        """Return the compiled rules for user_agent, longest first, Allow first on ties."""
+        matcher = self._matchers.get(user_agent)
+        if matcher is None:
+            agent = self._group_for(user_agent)
+            rules = self.groups.get(agent, []) if agent is not None else []
+            matcher = [(allow, _compile_rule(pattern))
+                       for allow, pattern in sorted(rules, key=lambda rule: (-len(rule[1]), not rule[0]))]
+            self._matchers[user_agent] = matcher
+        return matcher
+
+    def is_allowed(self, url, user_agent='*'):
+        """Return True if user_agent may crawl url under these rules."""
+        if not self.reachable:
+            return False
+        parsed = urlparse(url)
+        path = parsed.path or '/'
+        if path == '/robots.txt':
+            return True
+        if parsed.query:
+            path += '?' + parsed.query
+        for allow, regex in self._matcher(user_agent):
+            if regex.match(path):
+                return allow
+        return True
+
+    def is_fresh(self):
+        """True while this copy may still be served from the cache."""
+        ttl = ROBOTS_TTL if self.reachable else FAILURE_TTL
+        return time.monotonic() - self.fetched_at < ttl
+
+
+def robots_url(url):
+    """Return the robots.txt URL for the host of url."""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+
+
+def fetch_robots(url):
+    """Download and parse the robots.txt for the host of url, bypassing the cache."""
+    location = robots_url(url)
+    try:
+        response = http_cache.get(location)
+    except Exception:
+        return RobotsFile(location)
+    return RobotsFile(location, response.status_code, response_text(response) if response.status_code == 200 else '')
+
+
+def get_robots(url):
+    """Return the RobotsFile for the host of url, fetching it when not cached."""
+    location = robots_url(url)
+    with _cache_lock:
+        robots = _cache.get(location)
+        if robots is not None and robots.is_fresh():
+            _cache.move_to_end(location)
+            return robots
+        host_lock = _host_locks.setdefault(location, threading.Lock())
+
+    # One fetch per host at a time; others wait for its result
+    with host_lock:
+        with _cache_lock:
+            robots = _cache.get(location)
+        if robots is None or not robots.is_fresh():
+            robots = fetch_robots(location)
+            with _cache_lock:
+                _cache[location] = robots
+                _cache.move_to_end(location)
+                while len(_cache) > CACHE_SIZE:
+                    evicted, _ = _cache.popitem(last=False)
+                    _host_locks.pop(evicted, None)
+    return robots
+
+
+def is_allowed(url, user_agent='*'):
+    """Return True if the robots.txt of url's host lets user_agent crawl url."""
+    return get_robots(url).is_allowed(url, user_agent)
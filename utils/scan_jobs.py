@@ -0,0 +1,426 @@
+"""
+Scan Jobs
+Runs scans on a bounded background worker pool and persists job state in SQLite.
+
+Submitting a job returns its id straight away; the request thread is free
+again while the scan runs. Job state lives in the same SQLite database as the
+usage tracking so any worker process can answer a status poll.
+
+While a job runs it can record progress events (emit) that a streaming
+endpoint reads back, and it can check whether the client asked for the
+remaining work to be dropped (check_cancelled).
+
+Each worker process refreshes the updated_at time of the jobs it has queued
+or running every HEARTBEAT_INTERVAL seconds. A pending job whose time is
+older than STALE_AFTER therefore belonged to a worker that died, however
+long it waited in the queue or has been running.
+
+Scans submitted with a key (see scan_key) are shared: while a scan for the
+same key is queued or running, or finished less than SCAN_RESULT_TTL seconds
+ago, submitting it again returns the existing job instead of starting a new
+one. The check and the insert happen in one SQLite transaction, so this
+holds across worker processes too.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = 'usage_tracking.db'
+
+# Scans run at the same time in one worker process
+MAX_WORKERS = int(os.environ.get('SCAN_JOB_WORKERS', 4))
+
+# Seconds a connection waits for another worker's write to finish
+DB_TIMEOUT = 30
+
+# Seconds between refreshes of the jobs a worker process owns
+HEARTBEAT_INTERVAL = 60
+
+# A pending job not refreshed for this long belonged to a worker that died
+STALE_AFTER = timedelta(minutes=int(os.environ.get('SCAN_JOB_STALE_MINUTES', 15)))
+
+# Seconds a finished scan is handed out again for identical submissions
+RESULT_TTL = int(os.environ.get('SCAN_RESULT_TTL', 600))
+
+# Seconds a cancel request waits for the client to reconnect before it takes effect
+CANCEL_GRACE = int(os.environ.get('SCAN_CANCEL_GRACE_SECONDS', 10))
+
+PENDING_STATUSES = ('queued', 'running', 'cancelling')
+
+_executor = None
+_executor_pid = None
+_lock = threading.Lock()
+
+# Ids of the jobs queued or running in this process
+_owned = set()
+
+# Id of the job running on the current thread, if any
+_current = threading.local()
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when its client asked for the work to stop."""
+
+
+def _connect(**kwargs):
+    return sqlite3.connect(DB_PATH, timeout=DB_TIMEOUT, **kwargs)
+
+
+def init_jobs_table():
+    """Create the scan job tables if they do not exist.
+
+    Also switches the database to write-ahead logging, so status polls keep
+    reading while job, event and heartbeat writes from several workers run.
+    """
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('PRAGMA journal_mode=WAL')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS scan_jobs (
+            id TEXT PRIMARY KEY,
+            job_type TEXT NOT NULL,
+            url TEXT NOT NULL,
+            status TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            created_at DATETIME NOT NULL,
+            updated_at DATETIME NOT NULL
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS scan_job_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id TEXT NOT NULL,
+            event TEXT NOT NULL,
+            data TEXT
+        )
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_scan_job_events_job ON scan_job_events (job_id, id)')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS scan_job_keys (
+            key TEXT PRIMARY KEY,
+            job_id TEXT NOT NULL,
+            submissions INTEGER NOT NULL DEFAULT 1
+        )
+    ''')
+    conn.commit()
+    conn.close()
+
+
+def _get_executor():
+    """Return the worker pool for this process, creating it on first use."""
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='scan-job')
+                _executor_pid = pid
+                # Jobs of a parent process are not run in a forked child
+                _owned.clear()
+                threading.Thread(target=_heartbeat, name='scan-job-heartbeat', daemon=True).start()
+    return _executor
+
+
+def _heartbeat():
+    """Keep refreshing the jobs this process owns so they are not taken for stale."""
+    while True:
+        time.sleep(HEARTBEAT_INTERVAL)
+        with _lock:
+            job_ids = list(_owned)
+        if not job_ids:
+            continue
+        try:
+            conn = _connect()
+            c = conn.cursor()
+            # A cancel request's time starts its grace period, so leave those alone
+            c.execute(f'''
+                UPDATE scan_jobs SET updated_at = ?
+                WHERE status IN ('queued', 'running') AND id IN ({', '.join('?' * len(job_ids))})
+            ''', [_now()] + job_ids)
+            conn.commit()
+            conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not refresh scan jobs: {e}")
+
+
+def _now():
+    return datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _update_job(job_id, status, result=None, error=None):
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('''
+        UPDATE scan_jobs
+        SET status = ?, result = ?, error = ?, updated_at = ?
+        WHERE id = ?
+    ''', (status, result, error, _now(), job_id))
+    conn.commit()
+    conn.close()
+
+
+def _run_job(job_id, func, args):
+    _update_job(job_id, 'running')
+    _current.job_id = job_id
+    try:
+        result = func(*args)
+        _update_job(job_id, 'done', result=json.dumps(result, default=str))
+    except JobCancelled:
+        _update_job(job_id, 'cancelled', error='The analysis was cancelled before it finished.')
+    except Exception as e:
+        logger.exception(f"Scan job {job_id} failed")
+        _update_job(job_id, 'failed', error=str(e))
+    finally:
+        _current.job_id = None
+        with _lock:
+            _owned.discard(job_id)
+        # The final result is stored on the job, so its progress events are no longer needed
+        _delete_job_events(job_id)
+
+
+def scan_key(job_type, url, *options):
+    """Return the key shared by scans of the same kind, URL and options.
+
+    The scheme and host are lowercased, a default port and the fragment are
+    dropped and an empty path becomes '/'. Options must be JSON-serializable;
+    sort any whose order does not matter before passing them.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or '').lower()
+    if parts.port and parts.port != {'http': 80, 'https': 443}.get(scheme):
+        netloc += f":{parts.port}"
+    normalized = urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))
+    raw = json.dumps([job_type, normalized, options], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _reusable_job(c, key):
+    """Return the id of a pending or recently finished job for key, or None."""
+    c.execute('''
+        SELECT j.id, j.status, j.updated_at
+        FROM scan_job_keys k JOIN scan_jobs j ON j.id = k.job_id
+        WHERE k.key = ?
+    ''', (key,))
+    row = c.fetchone()
+    if row is None:
+        return None
+
+    job_id, status, updated_at = row
+    age = datetime.utcnow() - datetime.strptime(updated_at, '%Y-%m-%d %H:%M:%S')
+    if status in PENDING_STATUSES and age <= STALE_AFTER:
+        return job_id
+    if status == 'done' and age <= timedelta(seconds=RESULT_TTL):
+        return job_id
+    return None
+
+
+def submit_job(job_type, url, func, *args, key=None):
+    """Queue func(*args) on the worker pool and return the new job id.
+
+    With a key, an identical job that is still pending or finished within
+    RESULT_TTL is returned instead, and func is not run.
+    """
+    job_id = uuid.uuid4().hex
+    now = _now()
+
+    conn = _connect(isolation_level=None)
+    c = conn.cursor()
+    try:
+        # Take the write lock before looking, so only one process can start the job
+        c.execute('BEGIN IMMEDIATE')
+        if key is not None:
+            existing = _reusable_job(c, key)
+            if existing is not None:
+                c.execute('''
+                    UPDATE scan_job_keys SET submissions = submissions + 1 WHERE key = ?
+                ''', (key,))
+                # Someone wants the result again; undo a pending cancel request
+                c.execute('''
+                    UPDATE scan_jobs SET status = 'running', updated_at = ?
+                    WHERE id = ? AND status = 'cancelling'
+                ''', (now, existing))
+                c.execute('COMMIT')
+                return existing
+
+        c.execute('''
+            INSERT INTO scan_jobs (id, job_type, url, status, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (job_id, job_type, url, 'queued', now, now))
+        if key is not None:
+            c.execute('''
+                INSERT OR REPLACE INTO scan_job_keys (key, job_id, submissions)
+                VALUES (?, ?, 1)
+            ''', (key, job_id))
+        c.execute('COMMIT')
+    except Exception:
+        if conn.in_transaction:
+            c.execute('ROLLBACK')
+        raise
+    finally:
+        conn.close()
+
+    executor = _get_executor()
+    with _lock:
+        _owned.add(job_id)
+    executor.submit(_run_job, job_id, func, args)
+    return job_id
+
+
+def emit(event, data):
+    """Record a progress event for the job running on this thread.
+
+    Does nothing when called outside a job, so the same code can run
+    synchronously as well. Events are best-effort: a database error is
+    logged and the job carries on.
+    """
+    job_id = getattr(_current, 'job_id', None)
+    if job_id is None:
+        return
+
+    try:
+        conn = _connect()
+        c = conn.cursor()
+        c.execute('''
+            INSERT INTO scan_job_events (job_id, event, data)
+            VALUES (?, ?, ?)
+        ''', (job_id, event, json.dumps(data, default=str)))
+        conn.commit()
+        conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Could not record {event} event for scan job {job_id}: {e}")
+
+
+def get_job_events(job_id, after_id=0):
+    """Return the (id, event, data) progress events recorded after after_id."""
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('''
+        SELECT id, event, data
+        FROM scan_job_events
+        WHERE job_id = ? AND id > ?
+        ORDER BY id
+    ''', (job_id, after_id))
+    events = [(row[0], row[1], json.loads(row[2])) for row in c.fetchall()]
+    conn.close()
+    return events
+
+
+def _delete_job_events(job_id):
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('DELETE FROM scan_job_events WHERE job_id = ?', (job_id,))
+    conn.commit()
+    conn.close()
+
+
+def _set_pending_status(job_id, from_status, to_status):
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('''
+        UPDATE scan_jobs
+        SET status = ?, updated_at = ?
+        WHERE id = ? AND status = ?
+    ''', (to_status, _now(), job_id, from_status))
+    conn.commit()
+    conn.close()
+
+
+def request_cancel(job_id):
+    """Ask a running job to stop once CANCEL_GRACE seconds have passed.
+
+    A client that reconnects within the grace period withdraws the request
+    with resume_job().
+
+    A job that several submissions share keeps running, since other clients
+    may still be waiting for it.
+    """
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('''
+        UPDATE scan_jobs
+        SET status = 'cancelling', updated_at = ?
+        WHERE id = ? AND status = 'running'
+          AND NOT EXISTS (SELECT 1 FROM scan_job_keys WHERE job_id = ? AND submissions > 1)
+    ''', (_now(), job_id, job_id))
+    conn.commit()
+    conn.close()
+
+
+def resume_job(job_id):
+    """Withdraw a cancel request that the job has not acted on yet."""
+    _set_pending_status(job_id, 'cancelling', 'running')
+
+
+def check_cancelled():
+    """Raise JobCancelled if the job running on this thread should stop.
+
+    A cancel request only counts once it is CANCEL_GRACE seconds old, so a
+    client that briefly lost its connection can still resume the job. If the
+    database cannot be read, the job carries on.
+    """
+    job_id = getattr(_current, 'job_id', None)
+    if job_id is None:
+        return
+
+    try:
+        conn = _connect()
+        c = conn.cursor()
+        c.execute('SELECT status, updated_at FROM scan_jobs WHERE id = ?', (job_id,))
+        row = c.fetchone()
+        conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Could not check scan job {job_id} for cancellation: {e}")
+        return
+
+    if row and row[0] == 'cancelling':
+        requested_at = datetime.strptime(row[1], '%Y-%m-%d %H:%M:%S')
+        if datetime.utcnow() - requested_at >= timedelta(seconds=CANCEL_GRACE):
+            raise JobCancelled()
+
+
+def get_job(job_id):
+    """Return the job as a dict, or None if there is no such job."""
+    conn = _connect()
+    c = conn.cursor()
+    c.execute('''
+        SELECT id, job_type, url, status, result, error, created_at, updated_at
+        FROM scan_jobs
+        WHERE id = ?
+    ''', (job_id,))
+    row = c.fetchone()
+    conn.close()
+
+    if row is None:
+        return None
+
+    job = {
+        'id': row[0],
+        'job_type': row[1],
+        'url': row[2],
+        'status': row[3],
+        'result': json.loads(row[4]) if row[4] else None,
+        'error': row[5],
+        'created_at': row[6],
+        'updated_at': row[7]
+    }
+
+    if job['status'] in PENDING_STATUSES:
+        updated_at = datetime.strptime(job['updated_at'], '%Y-%m-%d %H:%M:%S')
+        if datetime.utcnow() - updated_at > STALE_AFTER:
+            job['status'] = 'failed'
+            job['error'] = 'The scan was interrupted. Please try again.'
+
+    return job
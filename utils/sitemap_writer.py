@@ -0,0 +1,101 @@
+"""
+Sitemap Writer
+Generates sitemap XML as a stream of chunks instead of one big string.
+
+Entries are dicts with a 'loc' and optional 'lastmod', 'changefreq' and
+'priority' keys; every value is XML-escaped. write_sitemaps() splits the
+entries into files of at most MAX_URLS each, as the sitemap protocol
+requires, and adds a sitemap index listing them when more than one file is
+needed. Files can be gzipped as they are written.
+"""
+
+import itertools
+import os
+import zlib
+from xml.sax.saxutils import escape
+
+# Protocol limit on URLs in one sitemap file
+MAX_URLS = 50000
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+_ENTRY_FIELDS = ('loc', 'lastmod', 'changefreq', 'priority')
+
+
+def _element(tag, entry):
+    fields = ''.join(
+        f"        <{field}>{escape(str(entry[field]))}</{field}>\n"
+        for field in _ENTRY_FIELDS if entry.get(field) is not None
+    )
+    return f"    <{tag}>\n{fields}    </{tag}>\n"
+
+
+def iter_urlset(entries):
+    """Yield a <urlset> sitemap for entries as a stream of text chunks."""
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">\n'
+    for entry in entries:
+        yield _element('url', entry)
+    yield '</urlset>'
+
+
+def iter_index(sitemaps):
+    """Yield a <sitemapindex> for entries describing sitemap files."""
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">\n'
+    for entry in sitemaps:
+        yield _element('sitemap', entry)
+    yield '</sitemapindex>'
+
+
+def encode(chunks, compress=False):
+    """Encode text chunks as UTF-8, gzipping them on the fly if compress is set."""
+    if not compress:
+        for chunk in chunks:
+            yield chunk.encode('utf-8')
+        return
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _write(path, chunks, compress):
+    with open(path, 'wb') as f:
+        for data in encode(chunks, compress):
+            f.write(data)
+
+
+def write_sitemaps(entries, directory, base_url, name='sitemap', compress=False,
+                   lastmod=None, max_urls=MAX_URLS):
+    """Write entries to sitemap files in directory; return the file names, index last.
+
+    Up to max_urls entries go to {name}.xml. Beyond that, the entries are
+    split over {name}-1.xml, {name}-2.xml, ... and {name}.xml becomes an index
+    of those files, addressed under base_url. Compressed files get a .gz
+    suffix. Entries are read lazily; at most max_urls of them are held in
+    memory at a time. With no entries, {name}.xml is an empty urlset.
+    """
+    suffix = '.xml.gz' if compress else '.xml'
+    entries = iter(entries)
+    first = list(itertools.islice(entries, max_urls))
+    following = list(itertools.islice(entries, 1))
+    if not following:
+        filename = name + suffix
+        _write(os.path.join(directory, filename), iter_urlset(first), compress)
+        return [filename]
+
+    filenames = []
+    part = first
+    rest = itertools.chain(following, entries)
+    while part:
+        filename = f"{name}-{len(filenames) + 1}{suffix}"
+        _write(os.path.join(directory, filename), iter_urlset(part), compress)
+        filenames.append(filename)
+        part = list(itertools.islice(rest, max_urls))
+
+    index_name = name + suffix
+    base_url = base_url.rstrip('/') + '/'
+    index = [{'loc': base_url + filename, 'lastmod': lastmod} for filename in filenames]
+    _write(os.path.join(directory, index_name), iter_index(index), compress)
+    return filenames + [index_name]
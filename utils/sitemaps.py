@@ -0,0 +1,188 @@
+"""
+Sitemaps
+Finds a site's sitemap and counts its entries without loading it into memory.
+
+All candidate locations are requested at once and the first one, in
+priority order, that answers 200 is used. Only that one is read: its body is
+parsed as it streams in, and each <url> or <sitemap> entry is dropped once
+counted, so memory use does not grow with the size of the sitemap. Gzipped
+sitemaps (.xml.gz) are decompressed on the fly.
+
+For a sitemap index, up to CHILD_LIMIT of the sitemaps it lists are fetched
+concurrently and counted the same way.
+"""
+
+import os
+import xml.etree.ElementTree as ET
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from utils import http_client
+
+# Sitemaps of an index that are fetched and counted
+CHILD_LIMIT = int(os.environ.get('SITEMAP_CHILD_LIMIT', 20))
+
+# Concurrent requests for candidate locations or index children
+MAX_WORKERS = 8
+
+# Bytes read from the network at a time
+CHUNK_SIZE = 64 * 1024
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Element counted in each kind of sitemap
+_ENTRY_TAGS = {'urlset': 'url', 'sitemapindex': 'sitemap'}
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _events(chunks):
+    """Yield (event, element) pairs, as iterparse does, from chunks of XML bytes.
+
+    Gzipped input is recognised by its magic number and decompressed.
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    decompressor = None
+    started = False
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if not started:
+            started = True
+            if chunk[:2] == GZIP_MAGIC:
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if decompressor is not None:
+            chunk = decompressor.decompress(chunk)
+        parser.feed(chunk)
+        yield from parser.read_events()
+    if decompressor is not None:
+        parser.feed(decompressor.flush())
+    parser.close()
+    yield from parser.read_events()
+
+
+def parse_sitemap(chunks):
+    """Count the entries of a sitemap or sitemap index given as chunks of bytes.
+
+    Returns {'type': 'urlset' or 'sitemapindex', 'entries': count, 'sitemaps':
+    the first CHILD_LIMIT sitemap URLs of an index}. Raises ET.ParseError if
+    the data is not a well-formed sitemap.
+    """
+    kind = entry_tag = root = None
+    entries = 0
+    sitemaps = []
+    try:
+        for event, element in _events(chunks):
+            if root is None:
+                root = element
+                kind = _local_name(element.tag)
+                entry_tag = _ENTRY_TAGS.get(kind)
+                if entry_tag is None:
+                    raise ET.ParseError(f"Root element <{kind}> is not a sitemap")
+            elif event == 'end' and _local_name(element.tag) == entry_tag:
+                entries += 1
+                if kind == 'sitemapindex' and len(sitemaps) < CHILD_LIMIT:
+                    for child in element:
+                        if _local_name(child.tag) == 'loc' and child.text:
+                            sitemaps.append(child.text.strip())
+                # Entries are children of the root; drop the ones already counted
+                root.clear()
+    except zlib.error as e:
+        raise ET.ParseError(f"Corrupt gzip data: {e}")
+
+    return {'type': kind, 'entries': entries, 'sitemaps': sitemaps}
+
+
+def _open(url):
+    """Start a streaming GET for url; return the response, or None if it failed."""
+    try:
+        return http_client.get(url, stream=True)
+    except requests.RequestException:
+        return None
+
+
+def _summarize(url, response):
+    """Parse an open sitemap response into a summary dict and close it."""
+    try:
+        parsed = parse_sitemap(response.iter_content(chunk_size=CHUNK_SIZE))
+    except ET.ParseError as e:
+        return {'url': url, 'valid': False, 'error': str(e)}
+    except requests.RequestException as e:
+        return {'url': url, 'valid': False, 'error': f"Download failed: {e}"}
+    finally:
+        response.close()
+
+    summary = {'url': url, 'valid': True, 'type': parsed['type']}
+    if parsed['type'] == 'urlset':
+        summary['url_count'] = parsed['entries']
+    else:
+        summary['sitemap_count'] = parsed['entries']
+        summary['sitemaps'] = parsed['sitemaps']
+    return summary
+
+
+def fetch_sitemap(url):
+    """Download and summarize the sitemap at url; return None if it is not served."""
+    response = _open(url)
+    if response is None:
+        return None
+    if response.status_code != 200:
+        response.close()
+        return None
+    return _summarize(url, response)
+
+
+def count_index(summary):
+    """Fetch the sitemaps listed in an index summary and add up their URLs.
+
+    Adds 'children', one summary per fetched sitemap, and 'url_count', the
+    URLs listed by the children that are plain sitemaps.
+    """
+    children = summary.get('sitemaps', [])
+    if not children:
+        summary['children'] = []
+        summary['url_count'] = 0
+        return summary
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(children))) as executor:
+        results = list(executor.map(fetch_sitemap, children))
+    summary['children'] = [
+        result if result is not None else {'url': url, 'valid': False, 'error': 'Not found'}
+        for url, result in zip(children, results)
+    ]
+    summary['url_count'] = sum(child.get('url_count', 0) for child in summary['children'])
+    return summary
+
+
+def find_sitemap(candidates):
+    """Return the summary of the first candidate URL that serves a sitemap.
+
+    Candidates are requested concurrently, but only the first one (in the
+    given order) that answers 200 is read. A sitemap index is followed with
+    count_index(). Returns None if no candidate answers 200; a summary with
+    'valid' False if the first one that does is not a valid sitemap.
+    """
+    candidates = list(dict.fromkeys(candidates))
+    if not candidates:
+        return None
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(candidates))) as executor:
+        responses = list(executor.map(_open, candidates))
+
+    chosen = None
+    for url, response in zip(candidates, responses):
+        if response is None:
+            continue
+        if chosen is None and response.status_code == 200:
+            chosen = (url, response)
+        else:
+            response.close()
+    if chosen is None:
+        return None
+
+    summary = _summarize(*chosen)
+    if summary['valid'] and summary['type'] == 'sitemapindex':
+        count_index(summary)
+    return summary
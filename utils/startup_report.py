@@ -0,0 +1,88 @@
+"""
+Startup Report
+Measures how long a fresh interpreter takes to import the app and breaks the
+import cost down by module.
+
+Usage (from the project root):
+    python -m utils.startup_report              # import app, as a worker does
+    python -m utils.startup_report --top 30 passenger_wsgi
+
+The import runs in a new interpreter with python -X importtime, so nothing
+already imported by this script skews the numbers. Passenger re-executes the
+interpreter for every spawned worker, so this is the cost each spawn pays
+before serving its first request.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Top-level packages that belong to this project rather than a dependency
+PROJECT_PACKAGES = ('app', 'auth', 'main', 'models', 'modules', 'utils', 'passenger_wsgi')
+
+
+def measure(module):
+    """Import module in a fresh interpreter; return (wall seconds, import rows).
+
+    Each row is (module name, self microseconds, cumulative microseconds).
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    elapsed = time.perf_counter() - start
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+        raise RuntimeError(f"Importing {module} failed:\n" + '\n'.join(errors[-10:]))
+    return elapsed, rows
+
+
+def report(module, top=15):
+    """Print the startup time of module and where it goes."""
+    elapsed, rows = measure(module)
+    total_us = sum(self_us for name, self_us, cumulative_us in rows)
+
+    by_package = defaultdict(int)
+    for name, self_us, cumulative_us in rows:
+        by_package[name.split('.')[0]] += self_us
+
+    print(f"import {module}: {elapsed * 1000:.0f} ms wall time, "
+          f"{total_us / 1000:.0f} ms importing {len(rows)} modules")
+
+    print(f"\nTop {top} packages by import time")
+    for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {self_us / 1000:8.1f} ms  {package}")
+
+    print("\nProject modules (including what they import)")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: row[2], reverse=True):
+        if name.split('.')[0] in PROJECT_PACKAGES:
+            print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Break down the import time of the app.')
+    parser.add_argument('module', nargs='?', default='app', help='module to import (default: app)')
+    parser.add_argument('--top', type=int, default=15, help='number of packages to list')
+    args = parser.parse_args()
+    report(args.module, args.top)
+
+
+if __name__ == '__main__':
+    main()
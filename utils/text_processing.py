@@ -0,0 +1,111 @@
+"""
+Text Processing
+Stopword lists shared by the keyword analyzers.
+
+NLTK resources are loaded once per process, on first use rather than at
+import time. The data packages are downloaded at build time (nltk.txt) or by
+init_app.py, never while a scan is running. If the stopwords corpus is
+missing, a warning is logged, the built-in ENGLISH_STOPWORDS are used
+instead and loading is tried again after RETRY_AFTER seconds.
+"""
+
+import functools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# NLTK's English stopword list, used when the corpus is not installed
+ENGLISH_STOPWORDS = frozenset("""
+    i me my myself we our ours ourselves you you're you've you'll you'd your
+    yours yourself yourselves he him his himself she she's her hers herself it
+    it's its itself they them their theirs themselves what which who whom this
+    that that'll these those am is are was were be been being have has had
+    having do does did doing a an the and but if or because as until while of
+    at by for with about against between into through during before after
+    above below to from up down in out on off over under again further then
+    once here there when where why how all any both each few more most other
+    some such no nor not only own same so than too very s t can will just don
+    don't should should've now d ll m o re ve y ain aren aren't couldn couldn't
+    didn didn't doesn doesn't hadn hadn't hasn hasn't haven haven't isn isn't
+    ma mightn mightn't mustn mustn't needn needn't shan shan't shouldn
+    shouldn't wasn wasn't weren weren't won won't wouldn wouldn't
+""".split())
+
+# Common words on web pages that say nothing about the page's topic
+WEB_STOPWORDS = frozenset([
+    'www', 'com', 'org', 'net', 'html', 'http', 'https', 'page', 'site', 'website',
+    'home', 'about', 'contact', 'privacy', 'terms', 'policy', 'copyright', 'reserved',
+    'rights', 'click', 'here', 'more', 'read', 'view', 'see', 'get', 'new', 'best',
+    'top', 'good', 'great', 'free', 'online', 'web', 'internet', 'email', 'phone',
+    'address', 'location', 'time', 'date', 'year', 'day', 'today', 'now', 'menu',
+    'navigation', 'footer', 'header', 'sidebar', 'content', 'main', 'search', 'find',
+    'login', 'register', 'signup', 'sign', 'submit', 'button', 'link', 'back', 'next',
+    'previous', 'first', 'last', 'one', 'two', 'three', 'four', 'five', 'six', 'seven',
+    'eight', 'nine', 'ten', 'also', 'may', 'will', 'can', 'could', 'would', 'should',
+    'must', 'need', 'want', 'like', 'use', 'used', 'using', 'make', 'made', 'way',
+    'take', 'go', 'come', 'know', 'think', 'say', 'said', 'tell', 'ask', 'give',
+    'work', 'look', 'seem', 'try', 'keep', 'let', 'put', 'end', 'turn', 'start',
+    'show', 'play', 'run', 'move', 'live', 'believe', 'hold', 'bring', 'happen',
+    'write', 'provide', 'sit', 'stand', 'lose', 'add', 'change', 'follow', 'act',
+    'why', 'how', 'what', 'where', 'when', 'who', 'which', 'every', 'any', 'some',
+    'all', 'each', 'most', 'other', 'another', 'such', 'only', 'own', 'same', 'few',
+    'many', 'much', 'long', 'right', 'still', 'old', 'well', 'large', 'small', 'big',
+    'high', 'low', 'open', 'public', 'bad', 'different', 'able', 'under',
+    'never', 'after', 'then', 'them', 'these', 'so', 'her', 'into', 'him', 'has',
+    'no', 'my', 'than', 'been', 'call', 'its', 'down', 'did', 'part'
+])
+
+# Seconds before a resource that failed to load is tried again
+RETRY_AFTER = 300
+
+# name -> (value, error, time of the load attempt)
+_resources = {}
+_lock = threading.Lock()
+
+
+def _needs_load(entry):
+    return entry is None or (entry[1] is not None and time.monotonic() - entry[2] >= RETRY_AFTER)
+
+
+def _resource(name, loader):
+    """Load an NLTK resource once; a failure is remembered for RETRY_AFTER seconds."""
+    entry = _resources.get(name)
+    if _needs_load(entry):
+        with _lock:
+            entry = _resources.get(name)
+            if _needs_load(entry):
+                try:
+                    entry = (loader(), None, time.monotonic())
+                except LookupError as e:
+                    logger.warning(f"NLTK resource {name} is not installed; run init_app.py to download it")
+                    entry = (None, e, time.monotonic())
+                _resources[name] = entry
+    value, error, _ = entry
+    if error is not None:
+        raise error
+    return value
+
+
+def _load_stopwords():
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+
+def english_stopwords():
+    """Return NLTK's English stopwords as a set, or ENGLISH_STOPWORDS without the corpus."""
+    try:
+        return _resource('stopwords', _load_stopwords)
+    except LookupError:
+        return ENGLISH_STOPWORDS
+
+
+@functools.lru_cache(maxsize=2)
+def _with_web_stopwords(stop_words):
+    return stop_words | WEB_STOPWORDS
+
+
+def web_stopwords():
+    """Return the English stopwords together with WEB_STOPWORDS."""
+    return _with_web_stopwords(english_stopwords())
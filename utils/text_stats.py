@@ -0,0 +1,89 @@
+"""
+Text Statistics
+Word frequencies, densities and sentence and paragraph lengths of a text,
+computed from one pass over its words.
+
+Each distinct word is interned to an integer id the first time it is seen,
+so the text is held as a compact array of ids plus its vocabulary instead of
+a list of strings. Words are runs of letters, digits and underscores,
+lowercased, the same words KeywordCounter and the co-occurrence index see.
+A sentence ends at '.', '!' or '?'; a blank line ends both the sentence and
+the paragraph.
+
+Counting, sorting and segment lengths are done with NumPy over the id array.
+"""
+
+import re
+from array import array
+
+import numpy as np
+
+# A word, a run of sentence-ending punctuation or a paragraph break
+_TOKEN_RE = re.compile(r'\w+|[.!?]+|\n\s*\n')
+
+
+def _segment_lengths(ends, total):
+    """Return the number of words in each non-empty segment between ends."""
+    lengths = np.diff(np.array([0] + ends + [total]))
+    return lengths[lengths > 0].tolist()
+
+
+class TextStats:
+    """Interned words of one text and the statistics derived from them."""
+
+    def __init__(self, text):
+        word_ids = {}
+        ids = array('i')
+        sentence_ends = []
+        paragraph_ends = []
+        for token in _TOKEN_RE.findall(text.lower()):
+            first = token[0]
+            if first == '\n':
+                sentence_ends.append(len(ids))
+                paragraph_ends.append(len(ids))
+            elif first in '.!?':
+                sentence_ends.append(len(ids))
+            else:
+                ids.append(word_ids.setdefault(token, len(word_ids)))
+
+        self._word_ids = word_ids
+        self.vocabulary = list(word_ids)
+        self.ids = ids
+        self.word_count = len(ids)
+        self.counts = np.bincount(np.frombuffer(ids, dtype=np.intc), minlength=len(word_ids))
+        self.sentence_lengths = _segment_lengths(sentence_ends, self.word_count)
+        self.paragraph_lengths = _segment_lengths(paragraph_ends, self.word_count)
+
+    def word_id(self, word):
+        """Return the id of word, or None if it does not occur."""
+        return self._word_ids.get(word)
+
+    def count(self, word):
+        """Return how often word occurs."""
+        word_id = self._word_ids.get(word)
+        return 0 if word_id is None else int(self.counts[word_id])
+
+    def density(self, word):
+        """Return the occurrences of word in percent of all words."""
+        return (self.count(word) / self.word_count) * 100 if self.word_count > 0 else 0
+
+    def most_common(self, n=None, keep=None):
+        """Return [(word, count)] for the n most frequent words, most frequent first.
+
+        keep, if given, is called once per distinct word and leaves out the
+        words it returns false for. Ties keep the order of first occurrence,
+        as with Counter.most_common().
+        """
+        vocabulary = self.vocabulary
+        counts = self.counts
+        if keep is not None:
+            mask = np.fromiter(map(keep, vocabulary), dtype=bool, count=len(vocabulary))
+            counts = np.where(mask, counts, 0)
+        order = np.argsort(-counts, kind='stable')[:n]
+        return [(vocabulary[word_id], int(counts[word_id])) for word_id in order if counts[word_id] > 0]
+
+    def mean_sentence_length(self):
+        """Return the average number of words per sentence."""
+        if not self.sentence_lengths:
+            return 0
+        return sum(self.sentence_lengths) / len(self.sentence_lengths)